@@ -0,0 +1,164 @@
+"""
+A warm interpreter for running many short Awesome programs.
+
+    python awesomed.py serve SOCKET [--parser lalr]      start the daemon
+    python awesomed.py run SOCKET [langv4 options] FILE [ARGS...]
+
+The daemon imports langv4 and builds its parsers once, then listens on a Unix socket. Every
+request is run in a process forked from it, so each program starts from the same fresh
+interpreter state and none of them pays for Python, lark or prebuilt starting up.
+
+The client is kept thin (it imports nothing from this repo): it sends its arguments,
+working directory and environment, and passes its stdin, stdout and stderr along with them,
+so the program reads and writes them directly (a terminal stays a terminal). It exits with
+the program's exit status. When no daemon is listening, it runs langv4.py itself.
+"""
+# the client's imports are its startup time: no json (marshal), argparse only for the daemon
+import marshal
+import os
+import signal
+import socket
+import sys
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+# exit status when the program's process ended without reporting one
+LOST = 70
+
+
+# ---------- client ----------
+
+def run(socket_path: str, argv: list[str]) -> int:
+    """Runs `langv4.py *argv` in the daemon and returns its exit status."""
+    request = marshal.dumps({"argv": argv, "cwd": os.getcwd(), "env": dict(os.environ)})
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as conn:
+        conn.connect(socket_path)
+        # the descriptors go with the first byte; the request follows
+        socket.send_fds(conn, [b"\0"], [0, 1, 2])
+        conn.sendall(request)
+        conn.shutdown(socket.SHUT_WR)
+        reply = b"".join(iter(lambda: conn.recv(64), b""))
+    return int(reply) if reply else LOST
+
+
+def run_or_exec(socket_path: str, argv: list[str]):
+    try:
+        status = run(socket_path, argv)
+    except (FileNotFoundError, ConnectionRefusedError):
+        # no daemon: run it the slow way
+        langv4 = os.path.join(HERE, "langv4.py")
+        os.execv(sys.executable, [sys.executable, langv4, *argv])
+    sys.exit(status)
+
+
+# ---------- daemon ----------
+
+def serve(socket_path: str, parsers: list[str]):
+    import langv4
+
+    for parser in parsers:
+        # build the parser, and let it parse something once
+        langv4.parse("1 -> a\n", parser)
+    # the builtins prebuilt only imports on first use: every request would import them again
+    for name in list(langv4.prebuilt.builtin_funcs.loaders):
+        langv4.prebuilt.builtin_funcs[name]
+    langv4.prebuilt._vector.load_numpy()
+
+    if os.path.exists(socket_path):
+        try:
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+                probe.connect(socket_path)
+            sys.exit(f"a daemon is already listening on {socket_path}")
+        except ConnectionRefusedError:
+            # left behind by a daemon that is gone
+            os.unlink(socket_path)
+
+    listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    # only this user may run programs through it
+    old_umask = os.umask(0o177)
+    try:
+        listener.bind(socket_path)
+    finally:
+        os.umask(old_umask)
+    listener.listen(64)
+    # the requests' processes are reaped by the kernel; the daemon never waits for them
+    signal.signal(signal.SIGCHLD, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    print(f"awesomed: listening on {socket_path}", file=sys.stderr, flush=True)
+
+    try:
+        while True:
+            conn, _ = listener.accept()
+            sys.stdout.flush()
+            sys.stderr.flush()
+            if os.fork() == 0:
+                listener.close()
+                os._exit(handle(conn, langv4))
+            conn.close()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        listener.close()
+        os.unlink(socket_path)
+
+
+def handle(conn: socket.socket, langv4) -> int:
+    """Runs one request in this (forked) process and reports its exit status."""
+    status = LOST
+    try:
+        signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        signal.signal(signal.SIGINT, signal.default_int_handler)
+        _, fds, _, _ = socket.recv_fds(conn, 1, 3)
+        request = marshal.loads(b"".join(iter(lambda: conn.recv(1 << 16), b"")))
+        for target, fd in enumerate(fds):
+            os.dup2(fd, target)
+            os.close(fd)
+        os.chdir(request["cwd"])
+        os.environ.clear()
+        os.environ.update(request["env"])
+
+        try:
+            langv4.main(request["argv"])
+            status = 0
+        except SystemExit as e:
+            status = e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+            if isinstance(e.code, str):
+                print(e.code, file=sys.stderr)
+        except BaseException:
+            import traceback
+            traceback.print_exc()
+            status = 1
+        finally:
+            # os._exit skips atexit, where the output would be written otherwise
+            langv4.prebuilt.output.sink.flush()
+            sys.stdout.flush()
+            sys.stderr.flush()
+        conn.sendall(str(status).encode())
+    finally:
+        conn.close()
+    return status
+
+
+def main():
+    if len(sys.argv) > 2 and sys.argv[1] == "run":
+        # everything after the socket is langv4's, so it isn't parsed here
+        run_or_exec(sys.argv[2], sys.argv[3:])
+    import argparse
+    cli = argparse.ArgumentParser(prog="awesomed", description=__doc__,
+                                  formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = cli.add_subparsers(dest="command", required=True)
+    serve_cli = commands.add_parser("serve", help="start the daemon")
+    serve_cli.add_argument("socket")
+    serve_cli.add_argument("--parser", action="append", choices=("earley", "lalr"),
+                           help="parsers to build ahead of time (default both)")
+    run_cli = commands.add_parser("run", help="run a program in the daemon")
+    run_cli.add_argument("socket")
+    run_cli.add_argument("argv", nargs=argparse.REMAINDER)
+    opts = cli.parse_args()
+    if opts.command == "serve":
+        serve(opts.socket, opts.parser or ["earley", "lalr"])
+    run_or_exec(opts.socket, opts.argv)
+
+
+if __name__ == "__main__":
+    main()
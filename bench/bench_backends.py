@@ -0,0 +1,86 @@
+"""
+Run time of loop-heavy programs, tree walker vs bytecode VM.
+
+    python bench/bench_backends.py [--n 100000]
+
+Parsing is not timed (see bench_parser.py).
+"""
+import argparse
+import contextlib
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import langv4
+
+PROGRAMS = {
+    "arith": """\
+0 -> c
+loop i&[0,1,..]
+  i*i -> s
+  c+s -> c
+  i&[{n}] ?%> pool
+pool i
+c?
+""",
+    "calls": """\
+(x) sq
+  x*x
+sq ()
+0 -> c
+loop i&[0,1,..]
+  [i](sq) %>() -> s
+  c+s -> c
+  i&[{n}] ?%> pool
+pool i
+c?
+""",
+    "nested": """\
+0 -> c
+loop i&[0,1,..]
+  loop j&[0,1,2,3,4,5,6,7,8,9]
+    c+j -> c
+  pool j
+  i&[{n10}] ?%> pool
+pool i
+c?
+""",
+}
+
+
+def best_of(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run(tree, backend: str) -> str:
+    out = io.StringIO()
+    with contextlib.redirect_stdout(out):
+        langv4.BACKENDS[backend]().run_container(tree)
+    return out.getvalue()
+
+
+def main():
+    cli = argparse.ArgumentParser()
+    cli.add_argument("--n", type=int, default=100000, help="loop iterations")
+    cli.add_argument("--repeat", type=int, default=3)
+    opts = cli.parse_args()
+
+    print(f"{'program':>8} {'tree ms':>10} {'vm ms':>10} {'speedup':>8}")
+    for name, source in PROGRAMS.items():
+        tree = langv4.parse(source.format(n=opts.n, n10=opts.n // 10), "lalr")
+        if run(tree, "tree") != run(tree, "vm"):
+            raise SystemExit(f"{name}: the backends print different results")
+        times = {backend: best_of(lambda: run(tree, backend), opts.repeat) for backend in langv4.BACKENDS}
+        print(f"{name:>8} {times['tree'] * 1000:10.1f} {times['vm'] * 1000:10.1f} {times['tree'] / times['vm']:7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Cost of calling Awesome functions: nested calls from a loop, and gen_func callbacks.
+
+    python bench/bench_calls.py [--n 100000]
+
+Awesome functions can't stop recursing (their bodies ignore ?%>), so "nested" is a chain of
+three functions, each calling the next, n times.
+"""
+import argparse
+import contextlib
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import langv4
+
+PROGRAMS = {
+    "nested": """\
+(x) c
+  x+1
+c ()
+(x) b
+  [x](c) %>()
+b ()
+(x) a
+  [x](b) %>()
+a ()
+0 -> s
+loop i&[0,1,..]
+  [i](a) %>() -> s
+  i&[{n}] ?%> pool
+pool i
+s?
+""",
+    "gen_func": """\
+(array) count
+  -1 []>array + 1
+count ()
+[0,count,..] %> () -> counts
+{n} []>counts?
+""",
+}
+
+
+def best_of(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    cli = argparse.ArgumentParser()
+    cli.add_argument("--n", type=int, default=100000, help="loop iterations / terms")
+    cli.add_argument("--repeat", type=int, default=3)
+    opts = cli.parse_args()
+
+    print(f"{'program':>8} {'backend':>8} {'total ms':>10} {'us/call':>8}")
+    for name, source in PROGRAMS.items():
+        tree = langv4.parse(source.format(n=opts.n), "lalr")
+        calls = opts.n * 3 if name == "nested" else opts.n
+        for backend, cls in langv4.BACKENDS.items():
+            with contextlib.redirect_stdout(io.StringIO()):
+                t = best_of(lambda: cls().run_container(tree), opts.repeat)
+            print(f"{name:>8} {backend:>8} {t * 1000:10.1f} {t * 1e6 / calls:8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Latency of running a short program: a cold `python langv4.py` against the warm daemon
+(awesomed.py run), each a new process as a cron job would start it.
+
+    python bench/bench_daemon.py [--runs 20] [--parser lalr] [FILE]
+
+Without FILE, a one-line program is run.
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+LANGV4 = os.path.join(ROOT, "langv4.py")
+AWESOMED = os.path.join(ROOT, "awesomed.py")
+
+
+def latencies(command: list[str], runs: int) -> list[float]:
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(command, stdout=subprocess.DEVNULL, check=True)
+        times.append(time.perf_counter() - start)
+    return times
+
+
+def wait_for(path: str, timeout: float = 30):
+    deadline = time.monotonic() + timeout
+    while not os.path.exists(path):
+        if time.monotonic() > deadline:
+            raise TimeoutError(f"the daemon didn't start listening on {path}")
+        time.sleep(0.05)
+
+
+def main():
+    cli = argparse.ArgumentParser()
+    cli.add_argument("--runs", type=int, default=20)
+    cli.add_argument("--parser", default="lalr", choices=("earley", "lalr"))
+    cli.add_argument("file", nargs="?")
+    opts = cli.parse_args()
+
+    with tempfile.TemporaryDirectory() as temp:
+        program = opts.file
+        if program is None:
+            program = os.path.join(temp, "one.^%>")
+            with open(program, "w") as f:
+                f.write("1+2?\n")
+        socket_path = os.path.join(temp, "awesomed.sock")
+        daemon = subprocess.Popen([sys.executable, AWESOMED, "serve", socket_path, "--parser", opts.parser],
+                                  stderr=subprocess.DEVNULL)
+        try:
+            wait_for(socket_path)
+            args = ["--parser", opts.parser, program]
+            cold = latencies([sys.executable, LANGV4, *args], opts.runs)
+            warm = latencies([sys.executable, AWESOMED, "run", socket_path, *args], opts.runs)
+        finally:
+            daemon.terminate()
+            daemon.wait()
+
+    print(f"{'':>5} {'median ms':>10} {'best ms':>8}")
+    for name, times in (("cold", cold), ("warm", warm)):
+        print(f"{name:>5} {statistics.median(times) * 1000:10.1f} {min(times) * 1000:8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+A 10-operator expression evaluated n times, left-to-right and with precedence (OP_WS).
+
+    python bench/bench_expr.py [--n 1000000]
+
+The loop around it is timed too; the "empty" row is that loop alone, for reference.
+"""
+import argparse
+import contextlib
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import langv4
+
+EXPRESSIONS = {
+    "empty": "i",
+    "ltr": "i+1*2-3+4*5-6+7*8-9+10",
+    "prec": "i+1 * 2-3+4 * 5-6+7 * 8-9+10",
+}
+
+PROGRAM = """\
+0 -> c
+loop i&[0,1,..]
+  {expr} -> c
+  i&[{n}] ?%> pool
+pool i
+c?
+"""
+
+
+def best_of(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    cli = argparse.ArgumentParser()
+    cli.add_argument("--n", type=int, default=1000000, help="evaluations")
+    cli.add_argument("--repeat", type=int, default=3)
+    opts = cli.parse_args()
+
+    print(f"{'expr':>6} {'backend':>8} {'total ms':>10} {'ns/eval':>8}")
+    for name, expr in EXPRESSIONS.items():
+        tree = langv4.parse(PROGRAM.format(expr=expr, n=opts.n), "lalr")
+        for backend, cls in langv4.BACKENDS.items():
+            with contextlib.redirect_stdout(io.StringIO()):
+                t = best_of(lambda: cls().run_container(tree), opts.repeat)
+            print(f"{name:>6} {backend:>8} {t * 1000:10.1f} {t * 1e9 / opts.n:8.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""
+Time to generate the first n terms of a `[*seeds, fn, ..]` list (Fibonacci).
+
+    python bench/bench_gen_func.py [--sizes 1000,10000,100000]
+
+The generating function is called once per term with the prefix generated so far,
+so the time per term should stay flat as n grows.
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import langv4
+
+PROGRAM = """\
+(array) fib
+    -1 []>array -> a
+    -2 []>array -> b
+    a+b
+fib ()
+[0,1,fib,..] %> () -> fibs
+{n} []>fibs -> last
+"""
+
+
+def best_of(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    cli = argparse.ArgumentParser()
+    cli.add_argument("--sizes", default="1000,10000,100000", help="number of terms to generate")
+    cli.add_argument("--repeat", type=int, default=3)
+    opts = cli.parse_args()
+
+    print(f"{'backend':>8} {'terms':>8} {'total ms':>10} {'us/term':>8}")
+    for n in map(int, opts.sizes.split(",")):
+        tree = langv4.parse(PROGRAM.format(n=n), "lalr")
+        for backend, cls in langv4.BACKENDS.items():
+            t = best_of(lambda: cls().run_container(tree), opts.repeat)
+            print(f"{backend:>8} {n:8} {t * 1000:10.1f} {t * 1e6 / n:8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""
+Elementwise list `*` and suffix `-` on long lists, with and without NumPy.
+
+    python bench/bench_list_ops.py [--n 1000000]
+
+Operands are PackedLists (how strings and int lists from Python arrive) and plain lists
+(how list literals and computed lists arrive); only the packed ones can use NumPy.
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from prebuilt import _vector, PackedList
+
+
+def best_of(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    cli = argparse.ArgumentParser()
+    cli.add_argument("--n", type=int, default=1000000, help="list length")
+    cli.add_argument("--repeat", type=int, default=3)
+    opts = cli.parse_args()
+
+    ints = list(range(opts.n))
+    operands = {
+        "packed": (PackedList.from_ints(ints), PackedList.from_ints(ints[opts.n // 2:])),
+        "list": (ints, ints[opts.n // 2:]),
+    }
+    numpy = _vector.load_numpy()
+    if numpy is None:
+        print("numpy is not installed, timing the pure Python path only")
+    print(f"{'operands':>8} {'op':>3} {'numpy ms':>10} {'python ms':>10}")
+    for kind, (a, b) in operands.items():
+        for name, fn in (("*", _vector.mul_lists), ("-", _vector.sub_lists)):
+            times = {}
+            for label, np in (("numpy", numpy), ("python", None)):
+                _vector.np = np
+                times[label] = best_of(lambda: fn(a, b), opts.repeat) * 1000
+            _vector.np = numpy
+            print(f"{kind:>8} {name:>3} {times['numpy'] if numpy else float('nan'):10.1f} {times['python']:10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Parse time per KB of source, earley vs lalr.
+
+    python bench/bench_parser.py [--sizes 1,2,4]
+
+Grammar build time is reported separately: earley builds once per process,
+lalr loads the analysed grammar from lark's on-disk cache after the first run.
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import langv4
+
+# a bit of everything the grammar has: functions, loops, generators, conditionals, calls
+CHUNK = """\
+(array) fib
+    -1 []>array -> a
+    -2 []>array -> b
+    a+b
+fib ()
+[0,1,fib,..] %> () -> fibs
+10 []>fibs?
+0 -> c
+loop i&[0,1,..]
+  c+i -> c
+  i&[10] ?%> pool
+pool i
+1+ 2*3 -> x: x+8 -> y
+4 []> [1,2,..]?
+"AB"+'AB'?
+[ "hello" ](print) %>()
+a&[0] ?%> @????????
+"""
+
+
+def source_of(kb: int) -> str:
+    reps = max(1, (kb * 1024) // len(CHUNK))
+    return CHUNK * reps
+
+
+def best_of(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    cli = argparse.ArgumentParser()
+    cli.add_argument("--sizes", default="1,2,4", help="source sizes in KB (earley slows down fast)")
+    cli.add_argument("--repeat", type=int, default=3)
+    opts = cli.parse_args()
+
+    for name in langv4.PARSERS:
+        start = time.perf_counter()
+        langv4.get_parser(name)
+        print(f"{name:>6} grammar build: {(time.perf_counter() - start) * 1000:8.1f} ms")
+
+    print(f"\n{'parser':>6} {'KB':>6} {'total ms':>10} {'ms/KB':>8}")
+    for kb in map(int, opts.sizes.split(",")):
+        code = source_of(kb)
+        size_kb = len(code) / 1024
+        for name in langv4.PARSERS:
+            t = best_of(lambda: langv4.parse(code, name), opts.repeat)
+            print(f"{name:>6} {size_kb:6.1f} {t * 1000:10.1f} {t * 1000 / size_kb:8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+Time to the first n digits of pi: computed (Chudnovsky, prebuilt.pi) and read back from
+the disk cache, with the old digit-by-digit spigot for the sizes it can manage.
+
+    python bench/bench_pi.py [--sizes 10000 100000 1000000] [--spigot-max 10000]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from prebuilt.pi import PiDigits
+
+
+def spigot():
+    """the generator `pi` used to be (without its "3" and "." strings)"""
+    q, r, t, k, n, l = 1, 0, 1, 1, 3, 3
+    while True:
+        if 4*q + r - t < n*t:
+            yield n
+            r = 10 * (r - n*t)
+            n = (10 * (3*q + r)) // t - 10*n
+            q *= 10
+        else:
+            r = (2*q + r) * l
+            n = (q * (7*k) + 2 + r) // (t * l)
+            q *= k
+            t *= l
+            l += 2
+            k += 1
+
+
+def timed(fn) -> float:
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def main():
+    cli = argparse.ArgumentParser()
+    cli.add_argument("--sizes", type=int, nargs="+", default=[10**4, 10**5, 10**6])
+    cli.add_argument("--spigot-max", type=int, default=10**4, help="largest size to run the spigot for")
+    opts = cli.parse_args()
+
+    print(f"{'digits':>8} {'compute s':>10} {'cached s':>9} {'spigot s':>9}")
+    for n in opts.sizes:
+        with tempfile.TemporaryDirectory() as cache:
+            t_compute = timed(lambda: PiDigits(cache)[n - 1])
+            t_cached = timed(lambda: PiDigits(cache)[n - 1])
+        t_spigot = float("nan")
+        if n <= opts.spigot_max:
+            digits = spigot()
+            t_spigot = timed(lambda: [next(digits) for _ in range(n)])
+        print(f"{n:>8} {t_compute:10.3f} {t_cached:9.3f} {t_spigot:9.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Per-call overhead of Python functions wrapped for Awesome (what importpy hands out).
+
+    python bench/bench_pycall.py [--n 1000000]
+
+Each function is called n times through prebuilt._importpy.wrap_pyfunc and directly; the
+difference is what the wrapper (argument binding and conversion) costs per call.
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from prebuilt import PackedList
+from prebuilt._importpy import wrap_pyfunc
+
+
+def add(a: int, b: int) -> int:
+    return a + b
+
+
+def shout(s: str) -> str:
+    return s
+
+
+def total(values: list[int]) -> int:
+    return len(values)
+
+
+# (function, its arguments as Awesome passes them, the same arguments for a direct call)
+CASES = {
+    "randint": (random.randint, (1, 6), (1, 6)),
+    "int,int": (add, (1, 2), (1, 2)),
+    "str": (shout, (PackedList.from_str("hello"),), ("hello",)),
+    "list[int]": (total, (PackedList.from_ints([1, 2, 3]),), ([1, 2, 3],)),
+}
+
+
+def best_of(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def calls(fn, args, n: int):
+    def run():
+        for _ in range(n):
+            fn(*args)
+    return run
+
+
+def main():
+    cli = argparse.ArgumentParser()
+    cli.add_argument("--n", type=int, default=1000000, help="calls per function")
+    cli.add_argument("--repeat", type=int, default=3)
+    opts = cli.parse_args()
+
+    print(f"{'function':>10} {'wrapped ms':>11} {'direct ms':>10} {'ns/call overhead':>17}")
+    for name, (func, args, direct_args) in CASES.items():
+        wrapped = wrap_pyfunc(func)
+        t_wrapped = best_of(calls(wrapped, args, opts.n), opts.repeat)
+        t_direct = best_of(calls(func, direct_args, opts.n), opts.repeat)
+        overhead = (t_wrapped - t_direct) * 1e9 / opts.n
+        print(f"{name:>10} {t_wrapped * 1000:11.1f} {t_direct * 1000:10.1f} {overhead:17.0f}")
+
+
+if __name__ == "__main__":
+    main()
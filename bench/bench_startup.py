@@ -0,0 +1,96 @@
+"""
+Startup time: what `import langv4` imports and how long it takes (python -X importtime),
+checked against a budget.
+
+    python bench/bench_startup.py [--runs 5] [--budget-ms 25] [--total-budget-ms 250]
+
+Each time is the best of the runs. It exits with 1 when prebuilt takes longer than
+--budget-ms to import, langv4 (with lark and everything else) longer than --total-budget-ms,
+or running a one-line program imports a module that is only meant for the builtins that
+need it (LAZY).
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# imported only by the builtins that use them
+LAZY = ("prebuilt.system", "prebuilt.importpy", "prebuilt.errors", "numpy", "subprocess",
+        "concurrent.futures", "base64")
+
+
+def import_times(command: list[str]) -> dict[str, tuple[int, int, str]]:
+    """module -> (self us, cumulative us, the module that imported it) from one run of
+    command under -X importtime"""
+    result = subprocess.run([sys.executable, "-X", "importtime", *command], cwd=ROOT,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True, check=True)
+    times = {}
+    # a module is listed after the ones it imports: the names seen at each depth, waiting for their parent
+    waiting: dict[int, list[tuple[str, int, int]]] = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        own, cumulative, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip())) // 2
+        name = name.strip()
+        for child, child_own, child_cumulative in waiting.pop(depth + 1, []):
+            times[child] = (child_own, child_cumulative, name)
+        waiting.setdefault(depth, []).append((name, int(own), int(cumulative)))
+    for child, child_own, child_cumulative in waiting.get(0, []):
+        times[child] = (child_own, child_cumulative, "")
+    return times
+
+
+def best(runs: list[dict]) -> dict[str, tuple[int, int, str]]:
+    merged: dict[str, tuple[int, int, str]] = {}
+    for times in runs:
+        for name, (own, cumulative, parent) in times.items():
+            if name not in merged or cumulative < merged[name][1]:
+                merged[name] = (own, cumulative, parent)
+    return merged
+
+
+def main():
+    cli = argparse.ArgumentParser()
+    cli.add_argument("--runs", type=int, default=5)
+    cli.add_argument("--budget-ms", type=float, default=25, help="most prebuilt may take to import")
+    cli.add_argument("--total-budget-ms", type=float, default=250, help="most langv4 may take to import")
+    cli.add_argument("--top", type=int, default=12, help="how many of langv4's imports to list")
+    opts = cli.parse_args()
+
+    times = best([import_times(["-c", "import langv4"]) for _ in range(opts.runs)])
+    langv4 = times["langv4"][1] / 1000
+    prebuilt = times["prebuilt"][1] / 1000
+
+    # langv4's own imports, slowest first
+    direct = sorted(((cumulative, name) for name, (_, cumulative, parent) in times.items() if parent == "langv4"), reverse=True)
+    print(f"{'module':>24} {'ms':>8}")
+    for cumulative, name in direct[:opts.top]:
+        print(f"{name:>24} {cumulative / 1000:8.1f}")
+    print(f"{'langv4 (total)':>24} {langv4:8.1f}")
+
+    with tempfile.TemporaryDirectory() as temp:
+        program = os.path.join(temp, "one.^%>")
+        with open(program, "w") as f:
+            f.write("1+2?\n")
+        loaded = import_times(["langv4.py", "--parser", "lalr", program])
+    eager = [name for name in LAZY if name in loaded]
+
+    failures = []
+    if prebuilt > opts.budget_ms:
+        failures.append(f"prebuilt imports in {prebuilt:.1f} ms, over the {opts.budget_ms:g} ms budget")
+    if langv4 > opts.total_budget_ms:
+        failures.append(f"langv4 imports in {langv4:.1f} ms, over the {opts.total_budget_ms:g} ms budget")
+    if eager:
+        failures.append(f"a one-line program imports {', '.join(eager)}")
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    if failures:
+        sys.exit(1)
+    print(f"ok: prebuilt {prebuilt:.1f} ms (budget {opts.budget_ms:g}), langv4 {langv4:.1f} ms (budget {opts.total_budget_ms:g})")
+
+
+if __name__ == "__main__":
+    main()
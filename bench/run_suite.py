@@ -0,0 +1,174 @@
+"""
+The benchmark suite: the Awesome programs in bench/programs, each run as `langv4.py` runs
+them, on every backend, with their time and peak memory.
+
+    python bench/run_suite.py [--backend tree vm] [--repeat 3] [--only NAME ...]
+                              [--save FILE] [--baseline FILE|none] [--threshold 0.15]
+                              [--compare-times]
+
+A program's time is the best of --repeat runs of its execute phase (langv4.py --time), so
+startup and parsing don't blur it; the wall time of the whole process is shown too. Peak
+memory is the process' maximum resident set size.
+
+--save writes the results as JSON. --baseline compares them with saved ones (by default
+bench/baseline.json, the results of the committed tree; `none` compares with nothing) and
+exits with 1 when a program printed something different, used more than --memory-threshold
+more memory, or got slower by more than --threshold (and --min-ms).
+
+Times are only compared with a baseline saved on this host (the same machine, system and
+Python) with at most as many --repeat runs: a best of 1 against a best of 5, or another
+machine's times, would be noise. --compare-times compares them anyway. To check timings on
+another machine, --save a baseline of the unchanged tree there first.
+"""
+import argparse
+import glob
+import hashlib
+import json
+import os
+import platform
+import re
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+LANGV4 = os.path.join(ROOT, "langv4.py")
+PROGRAMS = os.path.join(ROOT, "bench", "programs")
+BASELINE = os.path.join(ROOT, "bench", "baseline.json")
+
+
+def run_once(program: str, backend: str, parser: str) -> dict:
+    """one run of program: wall and execute seconds, peak memory (KiB) and its output's hash"""
+    with tempfile.TemporaryFile() as out, tempfile.TemporaryFile() as err:
+        start = time.perf_counter()
+        process = subprocess.Popen([sys.executable, LANGV4, "--parser", parser, "--backend", backend, "--time", program],
+                                   cwd=ROOT, stdout=out, stderr=err)
+        # wait4 gives this process' own rusage (RUSAGE_CHILDREN would be the largest so far)
+        _, status, usage = os.wait4(process.pid, 0)
+        wall = time.perf_counter() - start
+        process.returncode = os.waitstatus_to_exitcode(status)
+        out.seek(0)
+        err.seek(0)
+        output, errors = out.read(), err.read().decode(errors="replace")
+
+    # how run_awesome prints a program's error (the e2l program prints them mid-line)
+    if process.returncode != 0 or re.search(rb"^Awesome Error: ", output, re.MULTILINE):
+        detail = errors.strip() or output.decode(errors="replace").strip()
+        raise RuntimeError(f"{os.path.basename(program)} on {backend} failed ({process.returncode}): {detail[-500:]}")
+    phases = {}
+    for line in errors.splitlines():
+        parts = line.split()
+        if len(parts) == 3 and parts[2] == "ms":
+            phases[parts[0]] = float(parts[1]) / 1000
+    return {
+        "wall_s": wall,
+        "execute_s": phases["execute"],
+        # ru_maxrss is in KiB on Linux, bytes on macOS
+        "peak_kib": usage.ru_maxrss // 1024 if sys.platform == "darwin" else usage.ru_maxrss,
+        "output": hashlib.sha256(output).hexdigest(),
+    }
+
+
+def measure(program: str, backend: str, parser: str, repeat: int) -> dict:
+    runs = [run_once(program, backend, parser) for _ in range(repeat)]
+    return {
+        "wall_s": min(run["wall_s"] for run in runs),
+        "execute_s": min(run["execute_s"] for run in runs),
+        "peak_kib": max(run["peak_kib"] for run in runs),
+        "output": runs[0]["output"],
+    }
+
+
+def host() -> str:
+    """what the timings were measured on"""
+    return (f"{platform.node()} {platform.machine()}, {os.cpu_count()} CPUs, {platform.platform()}, "
+            f"Python {platform.python_version()}")
+
+
+def compare(results: dict, baseline: dict, opts, times: bool) -> list[str]:
+    """the regressions of results against baseline (in time too, if times)"""
+    regressions = []
+    for key, result in results.items():
+        old = baseline.get(key)
+        if old is None:
+            continue
+        slower = result["execute_s"] - old["execute_s"]
+        if times and slower > opts.min_ms / 1000 and result["execute_s"] > old["execute_s"] * (1 + opts.threshold):
+            regressions.append(f"{key}: {old['execute_s'] * 1000:.1f} -> {result['execute_s'] * 1000:.1f} ms")
+        if result["peak_kib"] > old["peak_kib"] * (1 + opts.memory_threshold):
+            regressions.append(f"{key}: peak memory {old['peak_kib'] / 1024:.1f} -> {result['peak_kib'] / 1024:.1f} MiB")
+        if result["output"] != old["output"]:
+            regressions.append(f"{key}: prints something else than the baseline")
+    return regressions
+
+
+def main():
+    cli = argparse.ArgumentParser()
+    cli.add_argument("--backend", nargs="+", default=["tree", "vm"], choices=("tree", "vm"))
+    cli.add_argument("--parser", default="lalr", choices=("earley", "lalr"))
+    cli.add_argument("--repeat", type=int, default=3)
+    cli.add_argument("--only", nargs="+", metavar="NAME", help="run only these programs (file names without .^%%>)")
+    cli.add_argument("--save", metavar="FILE", help="write the results to FILE as JSON")
+    cli.add_argument("--baseline", metavar="FILE", default=BASELINE,
+                     help="compare with results saved by --save (default bench/baseline.json, none for no comparison)")
+    cli.add_argument("--threshold", type=float, default=0.15, help="slowdown that counts as a regression (0.15 = 15%%)")
+    cli.add_argument("--min-ms", type=float, default=5, help="smaller slowdowns are noise, whatever the ratio")
+    cli.add_argument("--memory-threshold", type=float, default=0.10, help="peak memory growth that counts as a regression")
+    cli.add_argument("--compare-times", action="store_true",
+                     help="compare times even with a baseline from another host or with more --repeat runs")
+    opts = cli.parse_args()
+
+    programs = sorted(glob.glob(os.path.join(PROGRAMS, "*.^%>")))
+    names = {os.path.basename(path)[:-len(".^%>")]: path for path in programs}
+    if opts.only:
+        unknown = set(opts.only) - set(names)
+        if unknown:
+            cli.error(f"no such program: {', '.join(sorted(unknown))} (there are {', '.join(names)})")
+        names = {name: names[name] for name in opts.only}
+
+    baseline = {}
+    times = False
+    if opts.baseline != "none":
+        with open(opts.baseline) as f:
+            saved = json.load(f)
+        if saved["parser"] == opts.parser:
+            baseline = saved["results"]
+            times = opts.compare_times
+            if saved.get("host") != host():
+                note = f"it was measured on {saved.get('host', 'another host')}"
+            elif opts.repeat < saved.get("repeat", 1):
+                note = f"it is the best of {saved['repeat']} runs, these of {opts.repeat}"
+            else:
+                times = True
+            if not times:
+                print(f"comparing output and memory with {opts.baseline}, not times: {note} "
+                      f"(--compare-times to compare them anyway)", file=sys.stderr)
+        else:
+            print(f"not comparing: {opts.baseline} was measured with the {saved['parser']} parser", file=sys.stderr)
+
+    results = {}
+    print(f"{'program':>24} {'execute ms':>11} {'wall ms':>9} {'peak MiB':>9} {'baseline ms':>12} {'change':>8}")
+    for backend in opts.backend:
+        for name, path in names.items():
+            key = f"{backend}/{name}"
+            result = results[key] = measure(path, backend, opts.parser, opts.repeat)
+            old = baseline.get(key)
+            versus = f"{old['execute_s'] * 1000:12.1f} {100 * (result['execute_s'] / old['execute_s'] - 1):+7.1f}%" if old else ""
+            print(f"{key:>24} {result['execute_s'] * 1000:11.1f} {result['wall_s'] * 1000:9.1f} "
+                  f"{result['peak_kib'] / 1024:9.1f} {versus}")
+
+    if opts.save:
+        with open(opts.save, "w") as f:
+            json.dump({"host": host(), "python": platform.python_version(), "parser": opts.parser,
+                       "repeat": opts.repeat, "results": results}, f, indent=2)
+
+    regressions = compare(results, baseline, opts, times)
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    if regressions:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,26 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 import sys
 import os
 import itertools
+import functools
+import operator
+import argparse
+import time
+import array
+import pickle
+import tempfile
+import re
+import hashlib
+from collections import OrderedDict
 from types import FunctionType
+import lark
 from lark import Lark, Tree, Token
+from lark.visitors import Transformer_InPlace, VisitError, v_args
+from collections.abc import MutableMapping
 from typing import Any, Callable, Iterable, Iterator, List, Dict, Generator, Sequence, TypeAlias
 
 import prebuilt
+from prebuilt import PackedList
 from typing import TypeVar, Type
 
 
@@ -30,7 +44,9 @@ GRAMMAR = r"""
     LOOP_KW.2: "loop"
     POOL_KW.2: "pool"
 
-    loop_block: "loop" NAME "&" simple_expression block "pool" [NAME]
+    loop_block: "loop" NAME "&" simple_expression block POOL_END
+    # `pool i` closes the loop with its name (one token), it is not `pool` and then an `i` statement
+    POOL_END.2: /pool(?![^\s\[\]\(\)\{\},:"@%#?>+*&-\/()])([ \t]+[^\s\[\]\(\)\{\},:"@%#?>+*&-\/()]+)?/
 
     ?statement: func_def
               | loop_block
@@ -44,18 +60,25 @@ GRAMMAR = r"""
 
     # func_def: "(" NAME ")" block FNNAME "()"
     # func_def: "(" [NAME ("," NAME)*] ")" FNNAME block FNNAME "()"
-    func_def: "(" parameters ")" NAME block NAME "()"
+    func_def: _FUNC_OPEN parameters ")" NAME block FNNAME "()"
+
+    # "(" only opens a function definition when its ")" is followed by the function name,
+    # otherwise it is a parenthesized expression
+    _FUNC_OPEN.2: /\((?=[^()\n]*\)[ \t]*[^\s\[\]\(\)\{\},:"@%#?>+*&-\/()])/
 
     parameters: [param ("," param)*]
     param: PARAM_NAME ["$" NAME]
 
 # In your rule, use the new Terminal
 
-    conditional: simple_expression "?%>" (NAME|SYMBOL)
+    conditional: simple_expression "?%>" SYMBOL
 
     apply_keyword: complete_expression apply NAME
-    SYMBOL.1: /[^\s(]+[^\s]*/
+    # stops at ":" so `?%> @???????:@???????` is two statements
+    SYMBOL.1: /[^\s(:][^\s:]*/
     apply: "%>"
+    # "%>()" is one terminal, so `[..](f) %>()` and `[..](f) %> name` are decided by the lexer
+    _APPLY_CALL.2: /%>[ \t]*\(\)/
 
     block: (statement | separator)*
 
@@ -63,7 +86,7 @@ GRAMMAR = r"""
     codeblock_run: "#" NAME "#"
 
     assignment: complete_expression "->" ASSIGN_TARGET -> assignment
-    ASSIGN_TARGET: /[^\s?]+/
+    ASSIGN_TARGET: /[^\s?:]+/
 
     print_stmt: complete_expression QMARK+ -> print_op
               | "@" QMARK+                 -> only_skip
@@ -74,13 +97,13 @@ GRAMMAR = r"""
     complete_expression: func_call
                        | simple_expression
 
-    func_call: list_literal "(" NAME ")" apply "()" -> func_call
-             | list_literal "(" NAME ")"           -> func_prep
+    func_call: bracket "(" NAME ")" call_apply -> func_call
+             | bracket "(" NAME ")"            -> func_prep
+    call_apply: _APPLY_CALL -> apply
 
     ?simple_expression: term ((OP | OP_WS) term)*
 
-    ?term: list_literal
-         | generator
+    ?term: bracket
          | string
          | REV_STRING
          | atom
@@ -90,11 +113,16 @@ GRAMMAR = r"""
     atom: NUMBER -> number_lit
         | NAME   -> variable
 
-    list_literal: "[" [complete_expression ("," complete_expression)*] "]"
-
-    ?generator: "[" (complete_expression ",")* NAME "," ".." "]" "%>" "()" -> gen_func
-              | "[" complete_expression "," complete_expression "," ".." "]" -> gen_arithmetic
-              | "[" complete_expression "," ".." "]" -> gen_const
+    # list literals and infinite generators share one rule, so the parser never has to
+    # guess which one it is in before the ",.." or "%>()" shows up; _Brackets rewrites it to
+    # list_literal, gen_func, gen_arithmetic or gen_const
+    # list_literal: "[" [complete_expression ("," complete_expression)*] "]"
+    # gen_func: "[" (complete_expression ",")* NAME "," ".." "]" "%>" "()"
+    # gen_arithmetic: "[" complete_expression "," complete_expression "," ".." "]"
+    # gen_const: "[" complete_expression "," ".." "]"
+    bracket: "[" [complete_expression ("," complete_expression)* GEN_DOTS?] "]" gen_apply?
+    gen_apply: _APPLY_CALL
+    GEN_DOTS: /,[ \t]*\.\./
 
     string: ESCAPED_STRING
 
@@ -102,17 +130,18 @@ GRAMMAR = r"""
 
 
     # NUMBER: /-?\d+/
-    NUMBER: /\d+/
+    # digits that run into a name (12abc) are a NAME
+    NUMBER.1: /\d+(?![^\s\[\]\(\)\{\},:"@%#?>+*&-\/()])/
 
     # OP_WS: operator that is followed by whitespace in the source (user signaled precedence)
-    OP_WS: /(\+|-|\*|\/|\[\]>|&|==)(?=\s)/
+    OP_WS.1: /(\+|-|\*|\/|\[\]>|&|==)(?=\s)/
 
-    # OP: operator that is NOT followed by whitespace (default left-to-right)
-    OP: /(\+|-|\*|\/|\[\]>|&|==)(?=\S)/
+    # OP: operator that is NOT followed by whitespace (default left-to-right). "-" of "->" is not one
+    OP.1: /(\+|-(?!>)|\*|\/|\[\]>|&|==)(?=\S)/
 
     NAME.0: /[^\s\[\]\(\)\{\},:"@%#?>+*&-\/()]+/
     PARAM_NAME: /[^\s\[\]\(\)\{\},:"@%#?>+*$-\/]+/
-    # FNNAME: /[^\s\[\]\(\)\{\},:"?()\/]+/
+    FNNAME.2: /[^\s\[\]\(\)\{\},:"@%#?>+*&-\/()]+(?=[ \t]*\(\))/
 
 
     %import common.CNAME
@@ -125,22 +154,300 @@ GRAMMAR = r"""
     %import common.WS_INLINE
 %ignore WS_INLINE
 
-    %ignore /#[^\n{].*/  // Simple comments
+    # Simple comments. "#name#" and "#name{" / "#name@{" are codeblocks, not comments
+    %ignore /#(?![^\s\[\]\(\)\{\},:"@%#?>+*&-\/()]+[ \t]*(#|@?[ \t]*\{))[^\n{].*/
 
 """
 
+PARSERS = ("earley", "lalr")
+
+class _Brackets(Transformer_InPlace):
+    """Rewrites the shared `bracket` rule into the list_literal/gen_* nodes the interpreter runs."""
+
+    @v_args(meta=True)
+    def bracket(self, meta, children):
+        items = [c for c in children if isinstance(c, Tree) and c.data != "gen_apply"]
+        dots = any(isinstance(c, Token) and c.type == "GEN_DOTS" for c in children)
+        applied = any(isinstance(c, Tree) and c.data == "gen_apply" for c in children)
+
+        if not dots:
+            if applied:
+                raise SyntaxError(f"[Line {meta.line}] '%>()' needs an infinite list like [fn,..]")
+            return Tree("list_literal", items, meta)
+
+        if applied:
+            # [seeds..., fn, ..] %> ()  the last item has to be the bare function name
+            fn = items[-1].children[0] if items else None
+            if not (isinstance(fn, Tree) and fn.data == "variable"):
+                raise SyntaxError(f"[Line {meta.line}] [..,fn,..] %>() needs a function name before ','")
+            return Tree("gen_func", items[:-1] + [fn.children[0]], meta)
+        if len(items) == 2:
+            return Tree("gen_arithmetic", items, meta)
+        if len(items) == 1:
+            return Tree("gen_const", items, meta)
+        raise SyntaxError(f"[Line {meta.line}] infinite lists take one or two values before '..' (got {len(items)})")
+
+
+@functools.cache
+def get_parser(parser: str = "earley") -> Lark:
+    """
+    Build the parser once per process.
+    lalr also keeps the analysed grammar in lark's on-disk cache, so only the first run pays for it.
+    """
+    if parser == "lalr":
+        return Lark(GRAMMAR, start='start', parser='lalr', lexer='contextual',
+                    propagate_positions=True, cache=True)
+    if parser == "earley":
+        return Lark(GRAMMAR, start='start', parser='earley', propagate_positions=True)
+    raise ValueError(f"Unknown parser '{parser}', expected one of {PARSERS}")
+
+def parse(code: str, parser: str = "earley") -> Tree:
+    tree = get_parser(parser).parse(code)
+    try:
+        return _Brackets().transform(tree)
+    except VisitError as e:
+        raise e.orig_exc from None
+
+# --- Modules: `"name" %> import` ---
+# A module is found by name (with any of its extensions) in the current directory, or else
+# in the folders under it, IMPORT_DEPTH deep. The folders are indexed once per run, on the
+# first import that needs them. Parse trees are kept per process, and on disk in
+# PARSE_CACHE_DIR next to the module, so an unchanged module is never parsed twice.
+MODULE_EXTENSIONS = (".awesome-logical-language-program-file", ".elif-margorp-egaugnal-lacigol-emosewa", ".^%>")
+IMPORT_DEPTH = 2
+PARSE_CACHE_DIR = "__awesome_cache__"
+# bump when the trees parse() returns change in a way the grammar text doesn't show
+PARSE_CACHE_VERSION = 1
+# a cached tree is only used by the interpreter (grammar, lark) that wrote it
+PARSE_CACHE_TAG = hashlib.sha256(f"{PARSE_CACHE_VERSION}\0{lark.__version__}\0{GRAMMAR}".encode()).hexdigest()
+
+# (path, parser) -> (mtime_ns, size, tree)
+_parsed_files:dict[tuple[str, str], tuple[int, int, Tree]] = {}
+
+def parse_file(path: str, parser: str = "earley") -> Tree:
+    """parse() of a file's program, from the process' or the on-disk cache when it is unchanged."""
+    stat = os.stat(path)
+    cached = _parsed_files.get((path, parser))
+    if cached is not None and cached[:2] == (stat.st_mtime_ns, stat.st_size):
+        return cached[2]
+
+    with open(path, "rb") as f:
+        source = f.read()
+    digest = hashlib.sha256(source).hexdigest()
+    cache_dir = os.path.join(os.path.dirname(path), PARSE_CACHE_DIR)
+    cache_path = os.path.join(cache_dir, f"{os.path.basename(path)}.{parser}.pickle")
+    tree = None
+    try:
+        with open(cache_path, "rb") as f:
+            tag, source_digest, cached_tree = pickle.load(f)
+        if tag == PARSE_CACHE_TAG and source_digest == digest:
+            tree = cached_tree
+    except Exception:
+        # missing, from another version or damaged: parse again (and replace it)
+        pass
+
+    if tree is None:
+        tree = parse(source.decode(), parser)
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+            # write a new file and rename it, so a concurrent run never reads half of one
+            fd, temp = tempfile.mkstemp(dir=cache_dir, prefix=os.path.basename(cache_path))
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump((PARSE_CACHE_TAG, digest, tree), f, pickle.HIGHEST_PROTOCOL)
+            os.replace(temp, cache_path)
+        except OSError:
+            # the cache only saves time; a read-only directory doesn't stop the import
+            pass
+
+    _parsed_files[path, parser] = (stat.st_mtime_ns, stat.st_size, tree)
+    return tree
+
+def index_modules(root: str, depth: int) -> dict[str, str]:
+    """module name -> path, for the module files in root and the folders under it (depth deep).
+    Shallower files win, then the extensions in MODULE_EXTENSIONS' order."""
+    index:dict[str, str] = {}
+    level = [root]
+    for _ in range(depth + 1):
+        found:dict[str, tuple[int, str]] = {}
+        folders = []
+        for folder in level:
+            try:
+                entries = sorted(os.scandir(folder), key=lambda entry: entry.name)
+            except OSError:
+                continue
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    if not entry.name.startswith(".") and entry.name != PARSE_CACHE_DIR:
+                        folders.append(entry.path)
+                    continue
+                for rank, extension in enumerate(MODULE_EXTENSIONS):
+                    name = entry.name[:-len(extension)]
+                    if entry.name.endswith(extension) and name and name not in index:
+                        if name not in found or rank < found[name][0]:
+                            found[name] = (rank, entry.path)
+        index.update((name, path) for name, (_, path) in found.items())
+        level = folders
+    return index
+
+class Modules:
+    """The modules of one run: where they are, and which are imported already (a module
+    runs once, on its first import)."""
+    def __init__(self, root: str = ".", depth: int = IMPORT_DEPTH, parser: str = "earley"):
+        self.root = root
+        self.depth = depth
+        self.parser = parser
+        self.index:dict[str, str]|None = None
+        self.imported:set[str] = set()
+
+    def find(self, name: str) -> str|None:
+        # a name next to the root (or a path from it, like lib/mylib) needs no index
+        for extension in MODULE_EXTENSIONS:
+            path = os.path.join(self.root, name + extension)
+            if os.path.isfile(path):
+                return path
+        if self.index is None:
+            self.index = index_modules(self.root, self.depth)
+        return self.index.get(name)
+
+# The value of a slot that is not assigned (or of a Fold that has to be recomputed)
+UNSET: Any = object()
+
 @dataclass
 class AwesomeFunction:
     args: dict[str,str]
     body:Tree
+    # body compiled by AwesomeInterpreter.compile_function_body
+    code:Callable[[], "AwesomeType"]
+    # the slots of args, in order
+    params:tuple[int, ...] = ()
+    # results by arguments, for functions with a `$memo` param
+    memo:"Memo|None" = None
 
 T = TypeVar("T")
 
+# number of leading items every cache keeps, so repr() works under any policy
+REPR_ITEMS = 3
+
+class EvictedError(LookupError):
+    """An item was dropped by a bounded LazyList cache and can't be produced again."""
+
+class WindowCache:
+    """
+    Cache of a LazyList that keeps only the first REPR_ITEMS items and the last `size`.
+    Indexes are absolute (as in a list); len() is the number of items ever appended.
+    """
+    def __init__(self, size: int):
+        if size < 1:
+            raise ValueError("cache window must hold at least 1 item")
+        self.size = size
+        self.head = []
+        self.ring = [None] * size
+        self.count = 0
+
+    def append(self, item):
+        if self.count < REPR_ITEMS:
+            self.head.append(item)
+        slot = self.count % self.size
+        if self.count >= self.size:
+            self.evict(self.count - self.size, self.ring[slot])
+        self.ring[slot] = item
+        self.count += 1
+
+    def evict(self, index: int, item):
+        pass
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, index: int):
+        if not 0 <= index < self.count:
+            raise IndexError("index out of range")
+        if index >= self.count - self.size:
+            return self.ring[index % self.size]
+        if index < len(self.head):
+            return self.head[index]
+        return self.evicted(index)
+
+    def evicted(self, index: int):
+        raise EvictedError(f"item {index} of the list was evicted (the cache keeps the last {self.size})")
+
+class DiskCache(WindowCache):
+    """
+    WindowCache that spills evicted items to an unnamed temporary file (pickled, one offset
+    per item) instead of dropping them, so every index stays readable.
+    Items that can't be pickled (functions, lists of generators) are kept in memory.
+    """
+    def __init__(self, size: int, directory: str|None = None):
+        super().__init__(size)
+        self.file = tempfile.TemporaryFile(dir=directory)
+        self.offsets = array.array('q')
+        self.pinned = {}
+        self.end = 0
+
+    def evict(self, index, item):
+        try:
+            data = pickle.dumps(item, pickle.HIGHEST_PROTOCOL)
+        except (pickle.PicklingError, TypeError, AttributeError):
+            self.pinned[index] = item
+            self.offsets.append(-1)
+            return
+        self.file.seek(self.end)
+        self.file.write(data)
+        self.offsets.append(self.end)
+        self.end += len(data)
+
+    def evicted(self, index):
+        offset = self.offsets[index]
+        if offset < 0:
+            return self.pinned[index]
+        self.file.seek(offset)
+        return pickle.load(self.file)
+
+def parse_cache_policy(policy: str) -> tuple:
+    """
+    A LazyList cache policy string, checked and split:
+      unbounded         ("unbounded",)              keep every item (a plain list)
+      window:N          ("window", N)               keep the last N items, older ones raise EvictedError
+      disk[:N[:DIR]]    ("disk", N, DIR or None)    keep the last N (default 1024) in memory,
+                                                    spill older ones to a temp file
+    """
+    name, _, rest = policy.partition(":")
+    if name == "unbounded" and not rest:
+        return (name,)
+    if name == "window" and rest.isdigit():
+        return (name, int(rest))
+    if name == "disk":
+        size, _, directory = rest.partition(":")
+        if not size or size.isdigit():
+            return (name, int(size or 1024), directory or None)
+    raise ValueError(f"unknown LazyList cache policy {policy!r} (unbounded, window:N or disk[:N[:DIR]])")
+
+def make_cache(policy: str):
+    """Cache for a LazyList, from a policy string (see parse_cache_policy)."""
+    name, *args = parse_cache_policy(policy)
+    if name == "window":
+        return WindowCache(*args)
+    if name == "disk":
+        return DiskCache(*args)
+    return []
+
 class LazyList:
-    """A wrapper for generators that caches results for random access."""
-    def __init__(self, gen: Iterator[T]):
+    """
+    A wrapper for generators that caches results for random access.
+    The cache follows `policy` (see make_cache; default LazyList.cache_policy). Under every policy
+    len() is the number of items generated so far, repr() shows the first ones and
+    is_infinite stays True until the generator runs out; only which old items can still be
+    indexed (or iterated again) changes.
+    """
+    cache_policy = "unbounded"
+    # counts the items of every LazyList while a program is profiled
+    profiler: "Profiler|None" = None
+
+    def __init__(self, gen: Iterator[T], policy: str|None = None):
+        if LazyList.profiler is not None:
+            gen = LazyList.profiler.counted(gen)
         self.gen = gen
-        self.cache = []
+        self.cache = make_cache(policy or LazyList.cache_policy)
         self.is_infinite = True
 
     def __getitem__(self, index):
@@ -155,9 +462,16 @@ class LazyList:
 
     def __iter__(self):
         # Yield cached items then continue generator
-        yield from self.cache
+        cache = self.cache
+        if isinstance(cache, list):
+            yield from cache
+        else:
+            i = 0
+            while i < len(cache):
+                yield cache[i]
+                i += 1
         for item in self.gen:
-            self.cache.append(item)
+            cache.append(item)
             yield item
 
     def __len__(self):
@@ -165,9 +479,156 @@ class LazyList:
         return len(self.cache)
 
     def __repr__(self):
-        preview = ",".join(map(str, self.cache[:3]))
+        preview = ",".join(str(self.cache[i]) for i in range(min(REPR_ITEMS, len(self.cache))))
         return f"[{preview}{',..' if self.is_infinite else ''}]"
 
+class PrefixView(Sequence):
+    """
+    Read-only view of the first `length` items of `items` (a LazyList cache), handed to the
+    function of a `[*seeds, fn, ..]` list instead of a copy of everything generated so far.
+    `items` only ever grows at the end, so the view stays a snapshot. Behaves like a list:
+    negative indexes count from the end, and +, * and == work with lists.
+    """
+    __slots__ = ("items", "length")
+
+    def __init__(self, items: list|WindowCache, length: int):
+        self.items = items
+        self.length = length
+
+    def __len__(self):
+        return self.length
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self.items[i] for i in range(*index.indices(self.length))]
+        if index < 0:
+            index += self.length
+        if not 0 <= index < self.length:
+            raise IndexError("index out of range")
+        return self.items[index]
+
+    def __iter__(self):
+        return map(self.items.__getitem__, range(self.length))
+
+    def __contains__(self, item):
+        return item in self.__iter__()
+
+    def __eq__(self, other):
+        if isinstance(other, (list, PrefixView)):
+            return len(other) == self.length and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    def __add__(self, other):
+        if isinstance(other, (list, PrefixView)):
+            return list(self) + list(other)
+        return NotImplemented
+
+    def __radd__(self, other):
+        if isinstance(other, list):
+            return other + list(self)
+        return NotImplemented
+
+    def __mul__(self, times):
+        if isinstance(times, int):
+            return list(self) * times
+        return NotImplemented
+
+    def __repr__(self):
+        return repr(list(self))
+
+# finite lists as the operators see them: Python lists, strings, and gen_func prefix views
+LIST_TYPES = (list, PackedList, PrefixView)
+
+class InfiniteSequence(LazyList):
+    """
+    An infinite list whose n-th element has a closed form, so nothing is cached:
+    indexing is O(1) and `&` is answered mathematically.
+    `realized` stands in for len(cache) -- the number of elements a LazyList would have
+    computed by now -- so truthiness and repr match the generator-backed list.
+    """
+    def __init__(self):
+        self.realized = 0
+        self.is_infinite = True
+
+    def term(self, index: int):
+        raise NotImplementedError
+
+    def values(self) -> Iterator:
+        raise NotImplementedError
+
+    def __getitem__(self, index):
+        if index < 0: return 0 # Awesome logic
+        if index >= self.realized:
+            self.realized = index + 1
+        return self.term(index)
+
+    def __iter__(self):
+        seen = 0
+        for item in self.values():
+            seen += 1
+            if seen > self.realized:
+                self.realized = seen
+            yield item
+
+    def __len__(self):
+        return self.realized
+
+    def __repr__(self):
+        preview = ",".join(str(self.term(i)) for i in range(min(3, self.realized)))
+        return f"[{preview},..]"
+
+class ArithmeticSequence(InfiniteSequence):
+    """[start, start+step, ..]"""
+    def __init__(self, start: int, step: int):
+        super().__init__()
+        self.start = start
+        self.step = step
+
+    def term(self, index):
+        return self.start + index * self.step
+
+    def values(self):
+        return itertools.count(self.start, self.step)
+
+    def __contains__(self, item):
+        if not isinstance(item, int):
+            return False
+        if self.step == 0:
+            return item == self.start
+        offset = item - self.start
+        return offset % self.step == 0 and offset // self.step >= 0
+
+class ConstSequence(InfiniteSequence):
+    """[value, ..]"""
+    def __init__(self, value):
+        super().__init__()
+        self.value = value
+
+    def term(self, index):
+        return self.value
+
+    def values(self):
+        return itertools.repeat(self.value)
+
+    def __contains__(self, item):
+        return item is self.value or item == self.value
+
+class PiSequence(InfiniteSequence):
+    """[3,1,4,1,5,..], the `pi` builtin: prebuilt.pi computes the digits (once per process)"""
+    def __init__(self, digits: "prebuilt.pi.PiDigits"):
+        super().__init__()
+        self.digits = digits
+
+    def term(self, index):
+        return self.digits[index]
+
+    def values(self):
+        return iter(self.digits)
+
+    def __contains__(self, item):
+        # every digit shows up within the first 33
+        return type(item) is int and 0 <= item <= 9
+
 # AwesomeType = LazyList|int|AwesomeFunction|Callable|list["NestedList"]
 AwesomeBase: TypeAlias = int | LazyList | AwesomeFunction | Callable
 
@@ -176,20 +637,340 @@ AwesomeBase: TypeAlias = int | LazyList | AwesomeFunction | Callable
 # AND: AwesomeFunction, list[AwesomeFunction], etc.
 AwesomeType: TypeAlias = AwesomeBase | Sequence["AwesomeType"]
 
+# operator -> the AwesomeInterpreter method that implements it
+OPERATORS = {
+    '+': 'add',
+    '-': 'sub',
+    '*': 'mul',
+    '/': 'div',
+    '==': 'eq',
+    '[]>': 'get_index',
+    '&': 'contains',
+}
+
+# Operators that can skip the AwesomeInterpreter method when both sides are ints
+INT_OPERATORS = {'+': operator.add, '-': operator.sub, '*': operator.mul}
+
+# Operators that give the same result every time for the same literals, so expressions made
+# only of them and literals are folded (`[]>` and `&` on a literal list are left alone)
+FOLDABLE_OPERATORS = {'+', '-', '*', '/', '=='}
+
+class Fold:
+    """
+    The cached value of a literal-only expression such as `1+ 2*3`, computed by its first
+    get(). Numbers are mutable (`5 -> 2`), so AwesomeInterpreter.patch_literal resets the
+    folds that read the patched literal and the next get() computes the value again. A value
+    that isn't an int or a string (a list), or an error, isn't kept: it is computed every time.
+    """
+    __slots__ = ("value", "compute")
+
+    def __init__(self, compute:Callable[[], "AwesomeType"]):
+        self.value = UNSET
+        self.compute = compute
+
+    def get(self):
+        value = self.value
+        if value is UNSET:
+            value = self.compute()
+            # only immutable values can be shared between evaluations
+            if isinstance(value, (int, PackedList)):
+                self.value = value
+        return value
+
+    def __repr__(self):
+        return f"Fold({'stale' if self.value is UNSET else self.value})"
+
+# Precedence map (used when an operator has whitespace after it): higher number = higher precedence
+PRECEDENCE = {
+    '[]>': 4,
+    '*': 3,
+    '/': 3,
+    '+': 2,
+    '-': 2,
+    '&': 2,   # adjust if you want different
+    '==': 1
+}
+
+class SlotVars(MutableMapping):
+    """The variables of a program: a list of slots, indexed by name at compile time.
+    It is also a mapping, so code that only has a name can still use self.vars[name]."""
+    def __init__(self, initial:dict):
+        self.index:dict[str,int] = {}
+        self.slots:list = []
+        self.update(initial)
+
+    def slot(self, name:str) -> int:
+        idx = self.index.get(name)
+        if idx is None:
+            idx = self.index[name] = len(self.slots)
+            self.slots.append(UNSET)
+        return idx
+
+    def name(self, slot:int) -> str:
+        return next(name for name, idx in self.index.items() if idx == slot)
+
+    def __getitem__(self, name):
+        idx = self.index.get(name)
+        if idx is None or self.slots[idx] is UNSET:
+            raise KeyError(name)
+        return self.slots[idx]
+
+    def get(self, name, default=None):
+        idx = self.index.get(name)
+        if idx is None or self.slots[idx] is UNSET:
+            return default
+        return self.slots[idx]
+
+    def __setitem__(self, name, value):
+        self.slots[self.slot(name)] = value
+
+    def __delitem__(self, name):
+        if name not in self:
+            raise KeyError(name)
+        self.slots[self.index[name]] = UNSET
+
+    def __contains__(self, name):
+        idx = self.index.get(name)
+        return idx is not None and self.slots[idx] is not UNSET
+
+    def __iter__(self):
+        return (name for name, idx in self.index.items() if self.slots[idx] is not UNSET)
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+# `(n$memo) f` memoizes f with Memo.default_size entries, `(n$memo64) f` with 64 (0: no limit)
+MEMO_TYPE = re.compile(r"memo(\d*)")
+# builtins that only compute a value from their arguments (a builtin that prints isn't one:
+# call_memo also refuses a function whose call printed anything)
+PURE_BUILTINS = {"uppercase"}
+
+class Memo:
+    """
+    The results of a `$memo` function, keyed by its argument values, in an LRU cache of
+    `size` entries (no limit for 0). Whether the function can be memoized at all is decided
+    at its first call (AwesomeInterpreter.impurity); if not, `refused` says why and calls
+    run as usual. Results are dropped when the interpreter's epoch changes, i.e. when a
+    literal is patched or a function (re)defined, and when one of the global names the
+    function calls or reads (`depends`) is assigned something else.
+    """
+    default_size = 1024
+
+    def __init__(self, name:str, size:int|None=None):
+        self.name = name
+        self.size = self.default_size if size is None else size
+        self.results:OrderedDict = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.checked = False
+        self.refused:str|None = None
+        self.epoch = 0
+        # (name, value) of the global functions and builtins the body relies on
+        self.depends:tuple[tuple[str, Any], ...] = ()
+
+    @classmethod
+    def from_args(cls, name:str, args:dict[str,str|None]) -> "Memo|None":
+        """The Memo for a function whose params are args (name -> type), None if none is `$memo`."""
+        for param_type in args.values():
+            match = MEMO_TYPE.fullmatch(param_type or "")
+            if match:
+                return cls(name, int(match[1]) if match[1] else None)
+        return None
+
+    @staticmethod
+    def freeze(value) -> Any:
+        """A hashable key for value; TypeError for values that aren't compared by value
+        (infinite lists, views, functions)."""
+        kind = type(value)
+        if kind is int:
+            return value
+        if kind is PackedList:
+            data = value.data
+            return (kind, data if type(data) is bytes else data.tobytes())
+        if kind is list or kind is tuple:
+            return (kind, tuple(map(Memo.freeze, value)))
+        if kind is bool or kind is str:
+            return (kind, value)
+        raise TypeError(f"can't memoize on {kind.__name__}")
+
+    def reset(self, epoch:int):
+        self.results.clear()
+        self.checked = False
+        self.depends = ()
+        self.epoch = epoch
+
+    def current(self, variables) -> bool:
+        """Whether every name in depends still has the value the function was checked with."""
+        return all(variables.get(name, UNSET) is value for name, value in self.depends)
+
+    def get(self, key):
+        """The cached result for key (UNSET if there is none), counted as a hit or a miss."""
+        value = self.results.get(key, UNSET)
+        if value is UNSET:
+            self.misses += 1
+        else:
+            self.hits += 1
+            self.results.move_to_end(key)
+        return value
+
+    def put(self, key, value):
+        results = self.results
+        results[key] = value
+        if self.size and len(results) > self.size:
+            results.popitem(last=False)
+
+    def stats(self) -> str:
+        if self.refused is not None:
+            return f"{self.name}: not memoized, {self.refused}"
+        calls = self.hits + self.misses
+        rate = f"{100 * self.hits / calls:.1f}%" if calls else "-"
+        size = self.size or "unbounded"
+        return f"{self.name}: {self.hits} hits, {self.misses} misses ({rate}), {len(self.results)}/{size} entries"
+
+class Profiler:
+    """
+    --profile: wall time, runs, calls, infinite list items generated and memory blocks
+    allocated (net), by source line and by function.
+
+    The interpreter reports events: a statement starting (line), a function being entered
+    and left. What happened between two events is charged to the line that was running, in
+    the functions that were running; the profiler's own work is not. Statements report their
+    line only when the program is compiled with a profiler, so without one nothing is measured.
+    """
+    def __init__(self):
+        # line -> [seconds, runs, calls, items, blocks]
+        self.lines:dict[int, list] = {}
+        # function -> [calls, seconds in it (and its callees), seconds in it alone]
+        self.functions:dict[str, list] = {"<program>": [1, 0.0, 0.0]}
+        # ((functions, outermost first), (the line each one is at)) -> seconds, for flame graphs
+        self.stacks:dict[tuple[tuple[str, ...], tuple[int, ...]], float] = {}
+        # the functions running, and the line each one is at
+        self.running:list[str] = ["<program>"]
+        self.at:list[int] = [0]
+        self.entered:list[float] = [0.0]
+        # items generated since the last event (LazyList.profiler counts them)
+        self.items = 0
+        self.blocks = 0
+        self.last = 0.0
+        self.start()
+
+    def start(self):
+        """Starts the clock (compiling the program isn't counted)."""
+        self.resume()
+        self.entered[0] = self.last
+
+    def resume(self):
+        """Ends an event: what happens from here on is the program's."""
+        self.items = 0
+        self.blocks = sys.getallocatedblocks()
+        self.last = time.perf_counter()
+
+    def charge(self):
+        """Charges the time and blocks since the last event to the running line."""
+        elapsed = time.perf_counter() - self.last
+        blocks = sys.getallocatedblocks() - self.blocks
+        stats = self.lines.get(self.at[-1])
+        if stats is None:
+            stats = self.lines[self.at[-1]] = [0.0, 0, 0, 0, 0]
+        stats[0] += elapsed
+        stats[3] += self.items
+        stats[4] += blocks
+        self.functions[self.running[-1]][2] += elapsed
+        stack = (tuple(self.running), tuple(self.at))
+        self.stacks[stack] = self.stacks.get(stack, 0.0) + elapsed
+
+    def line(self, line:int):
+        self.charge()
+        self.at[-1] = line
+        stats = self.lines.get(line)
+        if stats is None:
+            stats = self.lines[line] = [0.0, 0, 0, 0, 0]
+        stats[1] += 1
+        self.resume()
+
+    def enter(self, name:str):
+        self.charge()
+        self.lines[self.at[-1]][2] += 1
+        calls = self.functions.get(name)
+        if calls is None:
+            calls = self.functions[name] = [0, 0.0, 0.0]
+        calls[0] += 1
+        self.running.append(name)
+        # until its first statement, a function is at the line that called it
+        self.at.append(self.at[-1])
+        self.entered.append(self.last)
+        self.resume()
+
+    def leave(self):
+        self.charge()
+        name = self.running.pop()
+        self.at.pop()
+        # time in a recursive function counts once, for its outermost call
+        if name not in self.running:
+            self.functions[name][1] += time.perf_counter() - self.entered[-1]
+        self.entered.pop()
+        self.resume()
+
+    def counted(self, gen:Iterator) -> Iterator:
+        """gen, counting the items it generates"""
+        for item in gen:
+            self.items += 1
+            yield item
+
+    def finish(self):
+        while len(self.running) > 1:
+            self.leave()
+        self.charge()
+        self.functions["<program>"][1] = time.perf_counter() - self.entered[0]
+
+    def report(self, code:str, top:int=30) -> str:
+        """The slowest lines and the functions, as tables."""
+        source = code.split("\n")
+        total = sum(stats[0] for stats in self.lines.values()) or 1
+        rows = [f"{'line':>6} {'ms':>10} {'%':>6} {'runs':>8} {'calls':>8} {'items':>8} {'blocks':>8}  source"]
+        for line, (seconds, runs, calls, items, blocks) in sorted(self.lines.items(), key=lambda item: -item[1][0])[:top]:
+            text = source[line - 1].strip() if 0 < line <= len(source) else ""
+            rows.append(f"{line or '-':>6} {seconds * 1000:10.2f} {100 * seconds / total:6.1f} "
+                        f"{runs:8} {calls:8} {items:8} {blocks:8}  {text}")
+        rows.append("")
+        rows.append(f"{'function':>20} {'calls':>8} {'total ms':>10} {'self ms':>10}")
+        for name, (calls, seconds, own) in sorted(self.functions.items(), key=lambda item: -item[1][1]):
+            rows.append(f"{name:>20} {calls:8} {seconds * 1000:10.2f} {own * 1000:10.2f}")
+        return "\n".join(rows)
+
+    def collapsed(self) -> str:
+        """The stacks in the collapsed format of flame graph tools (frames;... microseconds)."""
+        return "\n".join(f"{';'.join(map('{}:{}'.format, names, lines))} {round(seconds * 1e6)}"
+                         for (names, lines), seconds in sorted(self.stacks.items()) if seconds >= 5e-7)
+
 class AwesomeInterpreter:
     def __init__(self):
-        self.vars:dict[str,AwesomeType] = prebuilt.builtin_vars.to_dict().copy()
+        builtins = prebuilt.builtin_vars.to_dict()
+        # each program gets its own view of the shared digits (what it has realized)
+        self.vars = SlotVars({**builtins, "pi": PiSequence(builtins["pi"])})
 
         # self.funcs = {}
         self.codeblocks = {}
         # Mutable numbers: Maps the string "2" to the value 5, etc.
         self.literal_patches = {}
+        # literal -> the Folds that read it
+        self.folds:dict[str, list[Fold]] = {}
+        # bumped by anything that can change what a pure function returns (see Memo)
+        self.epoch = 0
+        # every `$memo` function, for --memo-stats
+        self.memos:list[Memo] = []
         self.should_break = False
         self.current_node = None # Track the node being executed
 
         self.xor_errors = True
 
         self.skip_lines_counter = 0
+        # `?` and the print builtin write here
+        self.output = prebuilt.output.sink
+        # `"name" %> import`
+        self.modules = Modules()
+        # set before compiling to profile the program (--profile)
+        self.profiler:Profiler|None = None
 
 
     # --- Core Helpers ---
@@ -199,93 +980,80 @@ class AwesomeInterpreter:
                 # Mutable Number Logic
                 return self.literal_patches.get(node.value, int(node.value))
             elif node.type == 'ESCAPED_STRING':
-                return [ord(c) for c in node.value[1:-1]]
+                return PackedList.from_str(node.value[1:-1])
             elif node.type == 'REV_STRING':
-                return [ord(c) for c in node.value[1:-1]][::-1]
+                return PackedList.from_str(node.value[-2:0:-1])
             else:
                 self.error(f"Unknown token type for get_val: {node.type} {node}", RuntimeError)
         self.error("cannot parse val thats not Token",TypeError)
 
-    def parse_val(self,node)->AwesomeType:
-        """Resolves atoms, numbers, strings to Python primitives/LazyLists."""
-        s = self._parse_val(node)
-        if isinstance(s,list) and node.line==1 and s==[117, 115, 101, 32, 101, 114, 114, 111, 114, 115]:
-            self.xor_errors = False
-        return s
-
-
-
+    # --- Compiler: parse tree -> closures ---
+    # Every node is compiled once, with its operators, names and literal values looked up
+    # ahead of time. Running a program is then only calling closures.
 
-    def run(self,child:Tree):
+    def compile_stmt(self, child:Tree) -> Callable[[], Any] | None:
+        """Compiles one statement. Separators compile to None."""
         op = child.data
-        if self.skip_lines_counter!=0:
-            if op=="separator":
-                self.skip_lines_counter-=1
-            return
 
         # Handle expr_stmt - function calls or expressions as statements
         if op == 'expr_stmt':
-            self.eval_expr(child.children[0])
+            return self.compile_expr(child.children[0])
 
         elif op == 'assignment':
-            val = self.eval_expr(child.children[0])
-            target = Itoken(child.children[1])
-            # Check if target is a number literal string
-            if target.value.isdigit():
-                # x -> 2 (Modify what "2" means)
-                lit_key = target.value
-                self.literal_patches[lit_key] = val
-            else:
-                # x -> a (Standard variable)
-                var_name = target.value
-                self.vars[var_name] = val
-
+            return self.compile_assignment(child)
 
         elif op == 'print_op':
-            val = self.eval_expr(child.children[0])
+            value = self.compile_expr(child.children[0])
             # Count is now the number of '?' tokens after the expression
             count = len([c for c in child.children if isinstance(c, Token) and c.type == 'QMARK'])
             # Logic for ??, ??? can be expanded here.
             # ? = print result.
-            print(f">> {val}" if count > 1 else val)
+            line = self.output.line
+            if count > 1:
+                return lambda: line(f">> {value()}")
+            return lambda: line(str(value()))
 
         elif op == 'only_skip':
             count = len([c for c in child.children if isinstance(c, Token) and c.type == 'QMARK'])
-            self.skip_lines(count)
+            def only_skip():
+                self.current_node = child
+                self.skip_lines(count)
+            return only_skip
 
 
         elif op == 'loop_block':
             var_name = Itoken(child.children[0]).value
-            iterable = self.eval_expr(child.children[1])
-
-            body = child.children[2]
-
-            # Handle Python list or LazyList
-            if isinstance(iterable, Iterable):
-                iterator = iter(iterable)
-            else:
-                iterator = []  # fallback for non-iterables
-
-
-            for item in iterator:
-                self.vars[var_name] = item
-                self.run_container(body)
-                if self.should_break:
-                    self.should_break = False
-                    break
+            iterable = self.compile_expr(child.children[1])
+            body = self.compile_container(child.children[2])
+            slots, slot = self.vars.slots, self.vars.slot(var_name)
+
+            def loop_block():
+                items = iterable()
+                # Handle Python list or LazyList, fallback for non-iterables
+                for item in (items if isinstance(items, Iterable) else []):
+                    slots[slot] = item
+                    body()
+                    if self.should_break:
+                        self.should_break = False
+                        break
+            return loop_block
 
         elif op == 'conditional':
             # expr ?%> stmt
-            val = self.eval_expr(child.children[0])
-            is_true = bool(val) #(isinstance(val, int) and val != 0) or (isinstance(val, list) and len(val) > 0)
-            if is_true:
-                stmt = child.children[1]
-                self.run_apply(Itoken(stmt).value,val)
+            condition = self.compile_expr(child.children[0])
+            apply = self.compile_apply(Itoken(child.children[1]).value)
+            def conditional():
+                val = condition()
+                if val: #(isinstance(val, int) and val != 0) or (isinstance(val, list) and len(val) > 0)
+                    apply(val)
+            return conditional
 
         elif op == 'func_def':
             params = child.children[0]
             arg_names = {}
             for param in params.children:
+                if param is None: # ()
+                    continue
                 param_name = Itoken(param.children[0]).value
                 param_type = Itoken(param.children[1]).value if param.children[1] else None
 
@@ -293,53 +1061,117 @@ class AwesomeInterpreter:
                 # TODO: add types
 
                 if param_name in arg_names:
-                    self.error(f"Duplicate parameter name '{param_name}' in function definition.", TypeError)
+                    message = f"Duplicate parameter name '{param_name}' in function definition."
+                    def duplicate_param():
+                        self.current_node = child
+                        self.error(message, TypeError)
+                    return duplicate_param
 
                 arg_names.update({param_name:param_type})
 
             func_name = Itoken(child.children[1]).value
-            # for param in child.children:
-            #     print("adding param:",param)
-            #     arg_names.append(Itoken(param).value)
-
-
-            # params_node = child.children[0]
-            # if params_node is None:
-            # else:
-            #     arg_names = [Itoken(params_node).value]
-            # arg_name:str = Itoken(child.children[0]).value
             body:Tree = child.children[2]
-            self.vars[func_name] = AwesomeFunction(arg_names, body)
+            code = self.compile_function_body(body)
+            # parameters are slots like any variable; a call saves and restores them
+            params = tuple(map(self.vars.slot, arg_names))
+            memo = self.make_memo(func_name, arg_names)
+            slots, slot = self.vars.slots, self.vars.slot(func_name)
+            def func_def():
+                self.epoch += 1
+                slots[slot] = AwesomeFunction(arg_names, body, code, params, memo)
+            return func_def
 
         elif op == 'codeblock_def':
             name = Itoken(child.children[0]).value
             # Check for '@' token
             is_delayed = len(child.children) > 2 and child.children[1] == "@"
-            body = child.children[-1]
-            self.codeblocks[name] = body
-            # If not delayed (no @), run immediately per spec
-            if not is_delayed:
-                self.run_container(body)
+            body = self.compile_container(child.children[-1])
+            codeblocks = self.codeblocks
+            def codeblock_def():
+                codeblocks[name] = body
+                # If not delayed (no @), run immediately per spec
+                if not is_delayed:
+                    body()
+            return codeblock_def
 
         elif op == 'codeblock_run':
             name = Itoken(child.children[0]).value
-            if name in self.codeblocks:
-                self.run_container(self.codeblocks[name])
+            codeblocks = self.codeblocks
+            def codeblock_run():
+                if name in codeblocks:
+                    codeblocks[name]()
+            return codeblock_run
 
         elif op == 'apply_keyword':
-            expr = child.children[0]
-            val = self.eval_expr(expr)[0] # type: ignore
-            assert isinstance(val,AwesomeFunction)
+            value = self.compile_expr(child.children[0])
             kw_name = Itoken(child.children[2]).value
-            self.run_apply(kw_name,val)
+            if kw_name == "import":
+                def import_stmt():
+                    name = value()
+                    self.current_node = child
+                    self.import_module(name)
+                return import_stmt
+            apply = self.compile_apply(kw_name)
+            def apply_keyword():
+                val = value()[0] # type: ignore
+                assert isinstance(val,AwesomeFunction)
+                apply(val)
+            return apply_keyword
 
 
 
         elif op in ["separator","start"]:
             # Ignore separators at this level
-            pass
+            return None
         else:
-            self.error(f"Unknown statement type: {op}", RuntimeError)
+            def unknown():
+                self.current_node = child
+                self.error(f"Unknown statement type: {op}", RuntimeError)
+            return unknown
+
+    def compile_assignment(self, child:Tree) -> Callable[[], AwesomeType]:
+        """Compiles `expr -> target`; the closure returns the assigned value."""
+        value = self.compile_expr(child.children[0])
+        target = Itoken(child.children[1]).value
+        # Check if target is a number literal string
+        if target.isdigit():
+            # x -> 2 (Modify what "2" means)
+            patch_literal = self.patch_literal
+            def assign_literal():
+                val = value()
+                patch_literal(target, val)
+                return val
+            return assign_literal
+
+        # x -> a (Standard variable)
+        slots, slot = self.vars.slots, self.vars.slot(target)
+        def assign():
+            val = slots[slot] = value()
+            return val
+        return assign
+
+    def compile_apply(self, kw_name:str) -> Callable[..., None]:
+        """`pool` is resolved here; other names go through run_apply, so unknown ones still only fail when reached."""
+        if kw_name == "pool":
+            def pool(param=None):
+                self.should_break = True
+            return pool
+        return lambda param=None: self.run_apply(kw_name, param)
+
+    def import_module(self, name:AwesomeType):
+        """`"name" %> import`: runs the module's program in this one, the first time."""
+        if not isinstance(name, PackedList):
+            self.error(f"import needs the module's name as a string, got {name!r}", TypeError)
+        module_name = name.to_str()
+        path = self.modules.find(module_name)
+        if path is None:
+            self.error(f"module '{module_name}' not found ({module_name}{MODULE_EXTENSIONS[-1]} or its long names, "
+                       f"up to {self.modules.depth} folders deep)", ImportError)
+        path = os.path.realpath(path)
+        if path in self.modules.imported:
+            return
+        self.modules.imported.add(path)
+        self.compile_program(parse_file(path, self.modules.parser))()
 
     def skip_lines(self,count:int):
             if count > 6:
@@ -352,7 +1184,7 @@ class AwesomeInterpreter:
             case "pool":
                 self.should_break = True
             case "macro":
-                print("TODO: macro",param)
+                self.output.line(f"TODO: macro {param}")
 
             case s if s.startswith("@") and len(s) > 1 and set(s[1:]) == {"?"}: #@????
                 self.skip_lines(len(s)-1)
@@ -363,166 +1195,251 @@ class AwesomeInterpreter:
 
     # --- Execution Loop ---
     def run_container(self, node):
-        self.current_node = node
-        if self.should_break: return
+        program = self.compile_program(node)
+        try:
+            program()
+        finally:
+            self.output.emit()
+
+    def compile_program(self, node) -> Callable[[], None]:
+        """Compiles a whole program (the start node); calling the result runs it."""
+        return self.compile_container(node)
 
+    def compile_container(self, node) -> Callable[[], None]:
         # Handle list of statements
         children = node.children if isinstance(node, Tree) else [node]
+        # separators are kept (as None) because @??????? skips count them
+        stmts = [(child.data == "separator", self.profiled(child, self.compile_stmt(child)))
+                 for child in children if isinstance(child, Tree)]
 
-        for child in children:
-            if self.should_break: break
-            if isinstance(child, Token):
-                continue
+        def run_block():
+            self.current_node = node
+            if self.should_break: return
 
-            self.run(child)
+            for is_separator, stmt in stmts:
+                if self.should_break: break
+                if self.skip_lines_counter != 0:
+                    if is_separator:
+                        self.skip_lines_counter -= 1
+                    continue
+                if stmt is not None:
+                    stmt()
+        return run_block
 
 
     # --- Expression Evaluator (Left-to-Right) ---
     def eval_expr(self, node)->AwesomeType:
-        self.current_node = node
+        return self.compile_expr(node)()
 
+    def compile_expr(self, node) -> Callable[[], AwesomeType]:
         if not isinstance(node, Tree):
-            return self.parse_val(node)
+            return self.compile_literal(node)
+
+        op = node.data
 
         # Base terms
-        elif node.data == "neg":
-            number = self.eval_expr(node.children[0])
-            assert isinstance(number,int)
-            return -number
-        elif node.data == 'number_lit':
-            return self.parse_val(node.children[0])
-        elif node.data == 'variable':
+        if op == "neg":
+            number = self.compile_expr(node.children[0])
+            def neg():
+                n = number()
+                self.current_node = node
+                assert isinstance(n,int)
+                return -n
+            return neg
+
+        elif op in ('number_lit', 'string', 'rev_string'):
+            return self.compile_literal(node.children[0])
+
+        elif op == 'variable':
             name = Itoken(node.children[0]).value
-            assert isinstance(name, str)
-            try:
-                return self.vars[name]
-            except KeyError:
-                self.error(f"Variable '{name}' not defined.",NameError)
-
-        elif node.data == 'string':
-            return self.parse_val(node.children[0])
-        elif node.data == 'rev_string':
-            return self.parse_val(node.children[0])
-
-        elif node.data == 'list_literal':
-            return [self.eval_expr(c) for c in node.children]
-
-        # Handle complete_expression - just evaluate its child
-        elif node.data == 'complete_expression':
-            return self.eval_expr(node.children[0])
+            slots, slot = self.vars.slots, self.vars.slot(name)
+            def variable():
+                value = slots[slot]
+                if value is UNSET:
+                    self.current_node = node
+                    self.error(f"Variable '{name}' not defined.",NameError)
+                return value
+            return variable
+
+        elif op == 'list_literal':
+            items = [self.compile_expr(c) for c in node.children]
+            return lambda: [item() for item in items]
+
+        # Handle complete_expression - just its child
+        elif op == 'complete_expression':
+            return self.compile_expr(node.children[0])
 
         # Handle simple_expression
-        elif node.data == 'simple_expression':
-            return self.eval_simple_expression(node)
+        elif op == 'simple_expression':
+            return self.compile_simple_expression(node)
 
         # Handle function calls
-        elif node.data == 'func_call':
-            # Evaluate the list literal to get arguments
-            args = self.eval_expr(node.children[0])
-            assert isinstance(args,list)
-
+        elif op == 'func_call':
+            args = self.compile_expr(node.children[0])
             func_name = Itoken(node.children[1]).value
-            # Call the function immediately
-            return self.call_func(func_name, args)
-
-        elif node.data == 'func_prep':
+            slots, slot = self.vars.slots, self.vars.slot(func_name)
+            def func_call():
+                # Evaluate the list literal to get arguments
+                values = args()
+                assert isinstance(values,list)
+                self.current_node = node
+                # Call the function immediately
+                fn = slots[slot]
+                if type(fn) is AwesomeFunction:
+                    return self.call_awesome(fn, func_name, values)
+                return self.call_func(func_name, values)
+            return func_call
+
+        elif op == 'func_prep':
             # Prepare function for later application
-            args = self.eval_expr(node.children[0])
+            args = self.compile_expr(node.children[0])
             func_name = Itoken(node.children[1]).value
             # Return a tuple that can be called later
-            return (func_name, args)
+            return lambda: (func_name, args())
 
         # Infinite Generators
-        elif node.data == 'gen_arithmetic':
-            start = self.eval_expr(node.children[0])
-            second = self.eval_expr(node.children[1])
-            assert isinstance(start,int) and isinstance(second,int)
-            step = second - start
-            return LazyList(itertools.count(start, step))
-
-        elif node.data == 'gen_const':
-            val = self.eval_expr(node.children[0])
-            return LazyList(itertools.repeat(val))
-
-        elif node.data == 'gen_func':
-            func_name = Itoken(node.children[-1]).value
-            resolved = self.resolve_var(func_name)
-
-            if not self.is_function(resolved):
-                self.error("not a function in gen_func expression",SyntaxError)
-
-
-
+        elif op == 'gen_arithmetic':
+            first = self.compile_expr(node.children[0])
+            second = self.compile_expr(node.children[1])
+            def gen_arithmetic():
+                start, next_value = first(), second()
+                self.current_node = node
+                return self.gen_arithmetic(start, next_value)
+            return gen_arithmetic
+
+        elif op == 'gen_const':
+            value = self.compile_expr(node.children[0])
+            return lambda: self.gen_const(value())
+
+        elif op == 'gen_func':
             # children[-1] is the NAME of the function
             # children[:-1] are the seed values
-            seed_nodes = node.children[:-1]
-            seeds = [self.eval_expr(s) for s in seed_nodes]
-
-            def func_gen():
-                acc = list(seeds)
-                # First, yield the seeds
-                for s in seeds:
-                    yield s
-                # Then, start calling the function to generate new elements
-                while True:
-                    # Pass the current state of the list to the generator function
-                    val = self.call_func(func_name, [list(acc)])
-                    acc.append(val)
-                    yield val
-
-            return LazyList(func_gen())
+            func_name = Itoken(node.children[-1]).value
+            seed_values = [self.compile_expr(s) for s in node.children[:-1]]
+
+            def gen_func():
+                self.current_node = node
+                return self.gen_func(func_name, [seed() for seed in seed_values])
+            return gen_func
         else:
-            self.error(f"Unknown expression type: {node.data}", RuntimeError)
+            def unknown():
+                self.current_node = node
+                self.error(f"Unknown expression type: {op}", RuntimeError)
+            return unknown
 
-    def execute_block(self, node):
-        """Executes a list of statements and returns the value of the last expression."""
-        last_val = 0
+    @staticmethod
+    def is_use_errors(token, value) -> bool:
+        """Whether the string literal token (value once parsed) is a "use errors" on line 1,
+        written either way ("use errors" or 'srorre esu'), which turns XOR-ed errors off."""
+        return isinstance(value, PackedList) and token.line == 1 and value == [117, 115, 101, 32, 101, 114, 114, 111, 114, 115]
+
+    def compile_literal(self, token) -> Callable[[], AwesomeType]:
+        """Numbers stay a lookup in literal_patches (they are mutable), strings are converted once."""
+        if isinstance(token, Token) and token.type == 'NUMBER':
+            # Mutable Number Logic
+            patches = self.literal_patches
+            key, default = token.value, int(token.value)
+            return lambda: patches.get(key, default)
+
+        value = self._parse_val(token)
+        if self.is_use_errors(token, value):
+            def use_errors():
+                self.xor_errors = False
+                return value
+            return use_errors
+        # strings are immutable PackedLists, so every evaluation can share one
+        return lambda: value
+
+    def compile_function_body(self, node) -> Callable[[], AwesomeType]:
+        """Compiles a function body, which returns the value of its last expression."""
         children = node.children if isinstance(node, Tree) else [node]
+        # (gives_value, step)
+        steps:list[tuple[bool, Callable[[], Any]]] = []
 
         for child in children:
-            if self.should_break: break
-            if isinstance(child, Token): continue
+            if not isinstance(child, Tree): continue
 
             op = child.data
             # Handle all statement types
             if op == 'print_op':
-                last_val = self.eval_expr(child.children[0])
-                print(last_val) # Simplified print logic
+                value = self.compile_expr(child.children[0])
+                def print_value(value=value, line=self.output.line):
+                    val = value()
+                    line(str(val)) # Simplified print logic
+                    return val
+                steps.append((True, self.profiled(child, print_value)))
 
             elif op == 'assignment':
-                last_val = self.eval_expr(child.children[0])
-                target = Itoken(child.children[1])
-                name = target.value
-                if name.isdigit():
-                    self.literal_patches[name] = last_val
-                else:
-                    self.vars[name] = last_val
+                steps.append((True, self.profiled(child, self.compile_assignment(child))))
 
             elif op == 'expr_stmt':
-                last_val = self.eval_expr(child.children[0])
-
-            # elif op == 'conditional':
-            #     cond = self.eval_expr(child.children[0])
-            #     if cond: # Awesome truthy logic
-            #         stmt = child.children[1]
-            #         if isinstance(stmt, Token) and stmt.type == 'POOL':
-            #             self.should_break = True
-            #         else:
-            #             self.execute_block(stmt)
+                steps.append((True, self.profiled(child, self.compile_expr(child.children[0]))))
 
             elif op in ('loop_block', 'func_def', 'codeblock_def', 'codeblock_run'):
-                # Route these back through the main run logic
-                self.run(child)
-
-        return last_val
+                # Compiled like top-level statements, so @??????? skips them too
+                stmt = self.compile_stmt(child)
+                def routed(stmt=stmt):
+                    if self.skip_lines_counter == 0:
+                        stmt()
+                steps.append((False, self.profiled(child, routed)))
+
+        def run_function():
+            last_val = 0
+            for gives_value, step in steps:
+                if self.should_break: break
+                if gives_value:
+                    last_val = step()
+                else:
+                    step()
+            return last_val
+        return run_function
+
+    # --- Infinite lists ---
+    def gen_arithmetic(self, start, next_value) -> ArithmeticSequence:
+        """[start, next_value, ..]"""
+        assert isinstance(start,int) and isinstance(next_value,int)
+        return ArithmeticSequence(start, next_value - start)
+
+    def gen_const(self, value) -> ConstSequence:
+        """[value, ..]"""
+        return ConstSequence(value)
+
+    def gen_func(self, func_name:str, seeds:list) -> LazyList:
+        """[*seeds, func_name, ..] %> ()"""
+        resolved = self.resolve_var(func_name)
+
+        if not self.is_function(resolved):
+            self.error("not a function in gen_func expression",SyntaxError)
+
+        # the LazyList appends every yielded value to its cache, so the function reads
+        # the prefix through a view of the cache instead of a copy of its own
+        def func_gen():
+            generated = lazy.cache
+            # First, yield the seeds
+            for s in seeds:
+                yield s
+            # Then, start calling the function to generate new elements
+            while True:
+                yield self.call_func(func_name, [PrefixView(generated, len(generated))])
+
+        lazy = LazyList(func_gen())
+        return lazy
 
     def call_funcType(self,fn,args:list):
         # TODO: verify types
-        return fn(*args)
+        # the function may print too, so what the program printed goes first
+        if self.output.pending:
+            self.output.emit()
+        result = fn(*args)
+        # the lines of `!|` (a builtin registered with streams) are read as the program reaches them
+        if isinstance(result, Iterator) and getattr(fn, "streams", False):
+            return LazyList(result)
+        return result
 
     def resolve_var(self,var_name:str)->AwesomeType:
-        if var_name in self.vars:
-            return self.vars[var_name]
+        value = self.vars.get(var_name, UNSET)
+        if value is not UNSET:
+            return value
 
         elif var_name in prebuilt.builtin_funcs:
             return prebuilt.builtin_funcs[var_name]
@@ -560,133 +1477,336 @@ class AwesomeInterpreter:
         fn = self.get_function(name)
 
         if callable(fn):
+            profiler = self.profiler
+            if profiler is not None:
+                profiler.enter(name)
+                try:
+                    return self.call_funcType(fn,arg_values)
+                finally:
+                    profiler.leave()
             return self.call_funcType(fn,arg_values)
+        return self.call_awesome(fn, name, arg_values)
 
-        arg_names, body = fn.args, fn.body
-
+    def call_awesome(self, fn:AwesomeFunction, name:str, arg_values:list):
+        params = fn.params
 
         # Check if the number of arguments matches
-        if len(arg_names) != len(arg_values):
-            self.error(f"Function '{name}' expects {len(arg_names)} arguments, but got {len(arg_values)}.", TypeError)
-
-        # 1. Scope Management: Save previous values
-        prev_values = {}
-        for i, arg_name in enumerate(arg_names):
-            prev_values[arg_name] = self.vars.get(arg_name) # Store old value (or None)
-            self.vars[arg_name] = arg_values[i]            # Assign new value
-
-        # 2. Execute the block
-        ret = self.execute_block(body)
-
-        # 3. Restore Scope: Clean up
-        for arg_name, old_val in prev_values.items():
-            if old_val is not None:
-                self.vars[arg_name] = old_val
-            else:
-                self.vars.pop(arg_name, None)
-
-        return ret
-
-    def eval_simple_expression(self, node):
+        if len(params) != len(arg_values):
+            self.error(f"Function '{name}' expects {len(params)} arguments, but got {len(arg_values)}.", TypeError)
+        profiler = self.profiler
+        if profiler is not None:
+            profiler.enter(name)
+            try:
+                if fn.memo is not None:
+                    return self.call_memo(fn, name, arg_values)
+                return self.bind_call(fn, arg_values)
+            finally:
+                profiler.leave()
+        if fn.memo is not None:
+            return self.call_memo(fn, name, arg_values)
+        return self.bind_call(fn, arg_values)
+
+    def profiled(self, node:Tree, stmt):
+        """stmt, reporting its line to the profiler first, when there is one."""
+        line = getattr(node.meta, "line", None)
+        if self.profiler is None or stmt is None or line is None:
+            return stmt
+        profiler_line = self.profiler.line
+        def profiled_stmt():
+            profiler_line(line)
+            return stmt()
+        return profiled_stmt
+
+    def bind_call(self, fn:AwesomeFunction, arg_values:list):
+        params = fn.params
+        # Parameters are dynamically scoped: the callee (and whatever it calls) sees them
+        # in their slots, and the caller's values come back when it returns or raises
+        slots = self.vars.slots
+        if len(params) == 1:
+            slot, = params
+            prev = slots[slot]
+            slots[slot] = arg_values[0]
+            try:
+                return fn.code()
+            finally:
+                slots[slot] = prev
+        prev_values = [slots[slot] for slot in params]
+        for slot, value in zip(params, arg_values):
+            slots[slot] = value
+        try:
+            return fn.code()
+        finally:
+            for slot, prev in zip(params, prev_values):
+                slots[slot] = prev
+
+    def call_memo(self, fn:AwesomeFunction, name:str, arg_values:list):
+        memo = fn.memo
+        assert memo is not None
+        if memo.epoch != self.epoch or not memo.current(self.vars):
+            memo.reset(self.epoch)
+        if not memo.checked:
+            depends:list[tuple[str, Any]] = []
+            memo.refused = self.impurity(fn, name, depends)
+            memo.depends = tuple(depends)
+            memo.checked = True
+        # a pending pool makes the body return 0 without running, that is not its result
+        if memo.refused is not None or self.should_break:
+            return self.bind_call(fn, arg_values)
+        try:
+            key = tuple(map(Memo.freeze, arg_values))
+        except TypeError:
+            return self.bind_call(fn, arg_values)
+        value = memo.get(key)
+        if value is UNSET:
+            written = self.output.written
+            value = self.bind_call(fn, arg_values)
+            if self.output.written != written:
+                # printed through a builtin: a cached result would drop the output
+                memo.refused = "prints"
+                return value
+            try:
+                Memo.freeze(value)
+            except TypeError:
+                # an infinite list or a function: each call gets its own
+                return value
+            memo.put(key, value)
+        return value
+
+    def make_memo(self, func_name:str, arg_names:dict[str,str|None]) -> Memo|None:
+        memo = Memo.from_args(func_name, arg_names)
+        if memo is not None:
+            self.memos.append(memo)
+        return memo
+
+    def impurity(self, fn:AwesomeFunction, name:str, depends:list|None=None) -> str|None:
+        """
+        Why fn can't be memoized, or None if its result only depends on its arguments (and
+        on the global functions and builtins it uses, added to depends as (name, value)).
+
+        It can't if its body (or a function it calls) prints, assigns anything but a
+        parameter, patches a literal, defines functions or codeblocks, runs a loop (which
+        sets its variable and can pool), calls `!`, importpy or another Python function, or
+        reads a variable that isn't a parameter or a function. Parameters are dynamically
+        scoped, so a callee may read its caller's. Output a builtin prints isn't seen here;
+        call_memo refuses the function when a call prints anything.
+        """
+        checked = set()
+        relies = [] if depends is None else depends
+
+        def expression(node, visible) -> str|None:
+            for sub in node.iter_subtrees():
+                if sub.data == 'variable':
+                    var = Itoken(sub.children[0]).value
+                    if var not in visible:
+                        value = self.vars.get(var)
+                        if not isinstance(value, AwesomeFunction):
+                            return f"reads global '{var}'"
+                        relies.append((var, value))
+                elif sub.data in ('func_call', 'gen_func'):
+                    callee = sub.children[1 if sub.data == 'func_call' else -1]
+                    reason = call(Itoken(callee).value, visible)
+                    if reason:
+                        return reason
+            return None
+
+        def call(callee, visible) -> str|None:
+            if callee in visible:
+                # a function passed as an argument is never a memo key (Memo.freeze)
+                return None
+            value = self.vars.get(callee, UNSET)
+            if isinstance(value, AwesomeFunction):
+                relies.append((callee, value))
+                reason = function(value, callee, visible)
+                return reason and f"{reason} (in {callee})"
+            if value is UNSET and callee in PURE_BUILTINS:
+                # until a variable of that name hides the builtin
+                relies.append((callee, UNSET))
+                return None
+            return f"calls '{callee}'"
+
+        def function(fn, name, visible) -> str|None:
+            if name in checked:
+                return None
+            checked.add(name)
+            visible = visible | fn.args.keys()
+            body = fn.body
+            for child in (body.children if isinstance(body, Tree) else [body]):
+                if not isinstance(child, Tree):
+                    continue
+                op = child.data
+                if op == 'print_op':
+                    reason = "prints"
+                elif op == 'assignment':
+                    target = Itoken(child.children[1]).value
+                    if target.isdigit():
+                        reason = f"patches the literal {target}"
+                    elif target not in visible:
+                        reason = f"assigns global '{target}'"
+                    else:
+                        reason = expression(child.children[0], visible)
+                elif op == 'expr_stmt':
+                    reason = expression(child.children[0], visible)
+                elif op == 'loop_block':
+                    reason = "runs a loop"
+                elif op == 'func_def':
+                    reason = "defines a function"
+                elif op in ('codeblock_def', 'codeblock_run'):
+                    reason = "runs a codeblock"
+                else:
+                    # not run in a function body (see compile_function_body)
+                    reason = None
+                if reason:
+                    return reason
+            return None
+
+        return function(fn, name, frozenset())
+
+    def compile_simple_expression(self, node) -> Callable[[], AwesomeType]:
+        """A simple_expression; when it is made only of literals, its value is computed once
+        and kept until one of its numbers is reassigned."""
+        chain = self.compile_operator_chain(node)
+        fold = self.compile_fold(node, chain)
+        return chain if fold is None else fold.get
+
+    def literal_keys(self, node) -> set[str]|None:
+        """The NUMBER literals a literal-only expression reads, None if it reads anything else."""
+        if isinstance(node, Token):
+            if node.type == 'NUMBER':
+                return {node.value}
+            if node.type in ('ESCAPED_STRING', 'REV_STRING'):
+                # evaluating "use errors" switches the error mode, so it has to run every time
+                return None if self.is_use_errors(node, self._parse_val(node)) else set()
+            return None
+        if not isinstance(node, Tree):
+            return None
+        if node.data in ('number_lit', 'string', 'rev_string', 'neg', 'complete_expression'):
+            children = node.children
+        elif node.data == 'simple_expression':
+            if any(str(t) not in FOLDABLE_OPERATORS for t in node.children[1::2]):
+                return None
+            children = node.children[0::2]
+        else:
+            return None
+        keys = set()
+        for child in children:
+            child_keys = self.literal_keys(child)
+            if child_keys is None:
+                return None
+            keys |= child_keys
+        return keys
+
+    def compile_fold(self, node, compute:Callable[[], AwesomeType]) -> Fold|None:
+        """A Fold for node if it is made only of literals. Its value is computed the first
+        time it runs (an expression on a line that never runs is never computed)."""
+        keys = self.literal_keys(node)
+        if keys is None:
+            return None
+        fold = Fold(compute)
+        for key in keys:
+            self.folds.setdefault(key, []).append(fold)
+        return fold
+
+    def patch_literal(self, key:str, value:AwesomeType):
+        """`value -> key` for a number key: changes what the literal means from now on."""
+        self.literal_patches[key] = value
+        self.epoch += 1
+        for fold in self.folds.get(key, ()):
+            fold.value = UNSET
+
+    def compile_operator_chain(self, node) -> Callable[[], AwesomeType]:
         """
         node is the parse tree node for simple_expression.
-        This function evaluates the node according to:
+        The closure evaluates the node according to:
         - default: left-to-right
         - if any operator token is OP_WS: evaluate using normal operator precedence
         """
-        # print("Evaluating simple_expression:", node.pretty())
-        # Build flattened lists: values and operator tokens
-        values = []
-        ops = []
-        # first value
-        values.append(self.eval_expr(node.children[0]))
-
-        i = 1
-        has_ws_op = False
-        while i < len(node.children):
-            op_token = node.children[i]   # a Token object
-            rhs = self.eval_expr(node.children[i+1])
-
-            # operator text (like "+", "*", "[]>", etc.)
-            op_text = str(op_token)
-
-            # record
-            ops.append((op_text, getattr(op_token, 'type', None)))
-            values.append(rhs)
-
-            if getattr(op_token, 'type', None) == 'OP_WS':
-                has_ws_op = True
-            i += 2
-
-        # Helper to apply operator using existing methods
-        def apply_op(a, op, b):
-            if op == "+":
-                return self.add(a, b)
-            elif op == "-":
-                return self.sub(a, b)
-            elif op == "*":
-                return self.mul(a, b)
-            elif op == "/":
-                return (a // b) if b != 0 else 0
-            elif op == "==":
-                return 1 if a == b else 0
-            elif op == "[]>":
-                return self.get_index(a, b)
-            elif op == "&":
-                return a in b
-            else:
-                raise RuntimeError(f"Unknown operator {op}")
+        # children alternate: value, op, value, op, value ...
+        operands = [self.compile_expr(c) for c in node.children[0::2]]
+        op_tokens = node.children[1::2]
+        # (method, the operator module function for two ints or None)
+        ops = [(self.operator(str(t)), INT_OPERATORS.get(str(t))) for t in op_tokens]
+        has_ws_op = any(getattr(t, 'type', None) == 'OP_WS' for t in op_tokens)
 
         # 1) No OP_WS: do strict left-to-right
         if not has_ws_op:
-            left = values[0]
-            for idx, (op_text, _op_type) in enumerate(ops):
-                right = values[idx+1]
-                left = apply_op(left, op_text, right)
-            return left
-
-        # 2) If OP_WS present: evaluate using normal precedence
-        # Precedence map: higher number = higher precedence
-        precedence = {
-            '[]>': 4,
-            '*': 3,
-            '/': 3,
-            '+': 2,
-            '-': 2,
-            '&': 2,   # adjust if you want different
-            '==': 1
-        }
-
-        # Shunting-yard style evaluation operating on the already-evaluated values list
-        val_stack = []
-        op_stack = []
+            if len(ops) == 1:
+                # the common `a+b`
+                (left_operand, right_operand), ((op, int_op),) = operands, ops
+                def binary():
+                    left = left_operand()
+                    right = right_operand()
+                    self.current_node = node
+                    if int_op and type(left) is int and type(right) is int:
+                        return int_op(left, right)
+                    return op(left, right)
+                return binary
+
+            def left_to_right():
+                values = iter([operand() for operand in operands])
+                self.current_node = node
+                left = next(values)
+                for (op, int_op), right in zip(ops, values):
+                    if int_op and type(left) is int and type(right) is int:
+                        left = int_op(left, right)
+                    else:
+                        left = op(left, right)
+                return left
+            return left_to_right
+
+        # 2) If OP_WS present: evaluate using normal precedence, in an order worked out now
+        plan = [(*ops[i], a, b) for i, a, b in self.precedence_plan([PRECEDENCE.get(str(t), 0) for t in op_tokens])]
+        def with_precedence():
+            values = [operand() for operand in operands]
+            self.current_node = node
+            for op, int_op, a, b in plan:
+                left, right = values[a], values[b]
+                if int_op and type(left) is int and type(right) is int:
+                    values[a] = int_op(left, right)
+                else:
+                    values[a] = op(left, right)
+            return values[0]
+        return with_precedence
 
-        # We'll iterate tokens in order: value0, op0, value1, op1, value2, ...
-        # Start with first value
-        val_stack.append(values[0])
+    @staticmethod
+    def precedence_plan(precedences:list[int]) -> list[tuple[int, int, int]]:
+        """
+        Shunting-yard over operand positions: the order to apply the operators in, as
+        (operator index, a, b) meaning values[a] = ops[i](values[a], values[b]).
+        The result ends up in values[0].
+        """
+        val_stack = [0]
+        op_stack = []  # (operator index, precedence)
+        plan = []
 
-        for idx, (op_text, _op_type) in enumerate(ops):
-            # push next value and decide operator stack actions
+        def reduce():
+            i = op_stack.pop()[0]
+            b = val_stack.pop()
+            a = val_stack[-1]
+            plan.append((i, a, b))
+
+        # We'll iterate tokens in order: value0, op0, value1, op1, value2, ...
+        for idx, precedence in enumerate(precedences):
             # while there is an operator on op_stack with >= precedence, pop and apply it
-            while op_stack and precedence.get(op_stack[-1], 0) >= precedence.get(op_text, 0):
-                op_to_apply = op_stack.pop()
-                b = val_stack.pop()
-                a = val_stack.pop()
-                val_stack.append(apply_op(a, op_to_apply, b))
+            while op_stack and op_stack[-1][1] >= precedence:
+                reduce()
             # push current operator and next value
-            op_stack.append(op_text)
-            val_stack.append(values[idx+1])
+            op_stack.append((idx, precedence))
+            val_stack.append(idx + 1)
 
         # flush remaining ops
         while op_stack:
-            op_to_apply = op_stack.pop()
-            b = val_stack.pop()
-            a = val_stack.pop()
-            val_stack.append(apply_op(a, op_to_apply, b))
+            reduce()
 
-        if len(val_stack) != 1:
+        if val_stack != [0]:
             raise RuntimeError("Evaluation error: value stack ended with multiple values")
-        return val_stack[0]
+        return plan
+
+    def operator(self, op_text:str) -> Callable[[Any, Any], AwesomeType]:
+        """The method implementing an operator, e.g. "+" -> self.add"""
+        try:
+            return getattr(self, OPERATORS[op_text])
+        except KeyError:
+            raise RuntimeError(f"Unknown operator {op_text}")
 
 
 
@@ -696,27 +1816,41 @@ class AwesomeInterpreter:
         return a + b
 
     def sub(self, a, b):
-        # String subtraction "Asuf" - "suf" -> "A" (simplified as list removal?)
-        # Spec implies normal math mostly.
+        # String subtraction "Asuf" - "suf" -> "A" (removes the suffix)
+        if isinstance(a, LIST_TYPES) and isinstance(b, LIST_TYPES):
+            return prebuilt.sub_lists(a, b)
         return a - b
 
     def mul(self, a, b):
         # [1,2] * [3,4] -> [3, 8] (Zip mult? Spec says [1,2,3]*[4,5,6] -> [4,10,18])
-        if isinstance(a, list) and isinstance(b, list):
-            return [x*y for x,y in zip(a,b)]
+        if isinstance(a, LIST_TYPES) and isinstance(b, LIST_TYPES):
+            return prebuilt.mul_lists(a, b)
         # "A" * 3 -> [65,65,65]
-        if isinstance(a, list) and isinstance(b, int):
+        if isinstance(a, LIST_TYPES) and isinstance(b, int):
             return a * b
         return a * b
 
+    def div(self, a, b):
+        return (a // b) if b != 0 else 0
+
+    def eq(self, a, b):
+        return 1 if a == b else 0
+
+    def contains(self, a, b):
+        # InfiniteSequence answers with __contains__; a generator-backed LazyList is scanned
+        return a in b
+
     def get_index(self, left, right):
         """Handles the 'index []> list' operation."""
         idx = int(left)
-        # If it's a LazyList, use its custom __getitem__ (which handles infinite caching)
-        if isinstance(right, (LazyList, list)):
+        # If it's a LazyList, use its custom __getitem__ (which handles infinite caching,
+        # or the closed form for an InfiniteSequence)
+        if isinstance(right, (LazyList, *LIST_TYPES)):
             # Awesome logic: index 0 is start, out of bounds is 0
             try:
                 return right[idx]
+            except EvictedError as e:
+                self.error(str(e), EvictedError)
             except (IndexError):
                 return 0
         return 0
@@ -735,28 +1869,822 @@ class AwesomeInterpreter:
         # Format the Awesome Error
         raise cls(f"[Line {self.line}] Awesome Error: {message}")
 
-# --- Running ---
+# --- Bytecode backend ---
+# AwesomeVM compiles a program to Code objects: a flat instruction array (op, arg, op, arg, ...),
+# a constant pool and slot-indexed variables. Loops, `?%>` and @??????? skipping become jumps,
+# and calls to Awesome functions push a frame instead of recursing in Python.
+
+# (ordered as AwesomeVM.execute tests them: most frequent first)
+OPNAMES = ("LOAD_VAR BINARY_VV BINARY_VN BINARY_VAR STORE_VAR LOAD_NUM BINARY_NUM BINARY NEXT_ITER "
+           "CHECK CALL RETURN FOR_ITER JUMP BREAK_IF JUMP_IF_FALSE BUILD_LIST SET_LAST LOAD_STR POP "
+           "LOAD_FOLD DUP PRINT SKIP CHECK_BREAK JUMP_IF_SKIPPING GET_ITER NEG STORE_LIT FUNC_PREP GEN_ARITH "
+           "GEN_CONST GEN_FUNC APPLY_IF APPLY_FIRST SET_BREAK MAKE_FUNCTION CODEBLOCK_DEF "
+           "CODEBLOCK_RUN IMPORT LINE USE_ERRORS ERROR").split()
+(LOAD_VAR, BINARY_VV, BINARY_VN, BINARY_VAR, STORE_VAR, LOAD_NUM, BINARY_NUM, BINARY, NEXT_ITER,
+ CHECK, CALL, RETURN, FOR_ITER, JUMP, BREAK_IF, JUMP_IF_FALSE, BUILD_LIST, SET_LAST, LOAD_STR, POP,
+ LOAD_FOLD, DUP, PRINT, SKIP, CHECK_BREAK, JUMP_IF_SKIPPING, GET_ITER, NEG, STORE_LIT, FUNC_PREP, GEN_ARITH,
+ GEN_CONST, GEN_FUNC, APPLY_IF, APPLY_FIRST, SET_BREAK, MAKE_FUNCTION, CODEBLOCK_DEF,
+ CODEBLOCK_RUN, IMPORT, LINE, USE_ERRORS, ERROR) = range(len(OPNAMES))
+
+# Instructions with two operands pack them in their argument: low | high << ARG_BITS
+# (BINARY_VAR: operator | slot, BINARY_NUM: operator | constant, FOR_ITER: slot | exit pc,
+# NEXT_ITER: slot | loop body pc). The high one is a Python int and never overflows; the low
+# one has to fit in ARG_BITS (CodeBuilder.low_operand). BINARY_VV and BINARY_VN (`var op
+# var`, `var op number`) have theirs in a constant, with the slot they store to (-1 pushes).
+ARG_BITS = 16
+ARG_MASK = (1 << ARG_BITS) - 1
+
+# Operators that can run user code: indexing or searching a [.., fn, ..] list calls fn
+# (their right side is that list, so not when it is written out)
+FOREIGN_OPERATORS = {'[]>', '&'}
+
+@dataclass
+class Code:
+    ops: list[int]
+    consts: list
+    # the parse tree node of every instruction (nodes[pc//2]), None for the ones that cannot fail
+    nodes: list
+    # slots of the parameters, for function bodies
+    params: tuple[int, ...] = ()
+    # (instruction, slot) -> the variable node of an operand merged into BINARY_VV/VN/VAR,
+    # which an undefined variable is reported at (the instruction's own node is the expression)
+    operand_nodes: dict = field(default_factory=dict)
+
+    def dis(self) -> str:
+        """A listing of the instructions: line, pc, opcode and argument."""
+        lines = []
+        for pc in range(0, len(self.ops), 2):
+            op, arg = self.ops[pc], self.ops[pc+1]
+            node = self.nodes[pc//2]
+            meta = getattr(node, 'meta', None)
+            line = meta.line if meta is not None and not meta.empty else ''
+            if op in (BINARY_VAR, BINARY_NUM, FOR_ITER, NEXT_ITER):
+                arg = f"{arg & ARG_MASK}, {arg >> ARG_BITS}"
+            if op in (BINARY_VV, BINARY_VN, LOAD_NUM, LOAD_FOLD, STORE_LIT, CALL, FUNC_PREP, GEN_FUNC, SKIP, CHECK, APPLY_IF,
+                      APPLY_FIRST, CODEBLOCK_RUN, ERROR):
+                arg = f"{arg} ({self.consts[arg]!r})"
+            lines.append(f"{line!s:>5} {pc:5} {OPNAMES[op]:<16} {arg}")
+        return "\n".join(lines)
+
+class CodeBuilder:
+    """Compiles a parse tree to a Code object for AwesomeVM.
+
+    Statements run in the same order and with the same skip/break rules as in AwesomeInterpreter:
+    after every statement that can run other code (calls, codeblocks, apply keywords) a CHECK
+    looks at should_break and skip_lines_counter. SKIP and CHECK jump with a table built at
+    compile time: the pcs after the separators that follow them in their container, the end of
+    the container and, inside a loop, the loop exit."""
+    def __init__(self, vm:"AwesomeVM"):
+        self.vm = vm
+        self.variables = vm.vars
+        self.ops:list[int] = []
+        self.consts:list = []
+        self.nodes:list = []
+        self.operand_nodes:dict[tuple[int,int], Any] = {}
+        # BREAK_IF pcs of each loop being compiled, innermost last
+        self.loops:list[list[int]] = []
+        # of each container being compiled: (separator pcs, [(SKIP/CHECK pc, separators before it)])
+        self.containers:list[tuple[list[int], list[tuple[int,int]]]] = []
+        # jumps to the final RETURN
+        self.returns:list[int] = []
+        # set when the statement being compiled can run other code
+        self.foreign = False
+
+    def code(self, params:tuple[int, ...]=()) -> Code:
+        if self.ops[-2:-1] == [SET_LAST]:
+            # RETURN 1 returns the top of the stack
+            self.ops[-2:] = RETURN, 1
+            if not self.returns:
+                return Code(self.ops, self.consts, self.nodes, params, self.operand_nodes)
+        for pc in self.returns:
+            self.patch(pc)
+        self.emit(RETURN)
+        return Code(self.ops, self.consts, self.nodes, params, self.operand_nodes)
+
+    def emit(self, op:int, arg:int=0, node=None) -> int:
+        pc = len(self.ops)
+        self.ops += (op, arg)
+        self.nodes.append(node)
+        return pc
+
+    @staticmethod
+    def low_operand(value:int, what:str) -> int:
+        """value, checked to fit in the low ARG_BITS of a packed argument"""
+        if not 0 <= value <= ARG_MASK:
+            raise OverflowError(f"{what} {value} doesn't fit in an instruction (at most {ARG_MASK})")
+        return value
+
+    def const(self, value) -> int:
+        self.consts.append(value)
+        return len(self.consts) - 1
+
+    def patch(self, pc:int):
+        """Points the jump at pc to the next instruction."""
+        self.ops[pc+1] = len(self.ops)
+
+    # --- Statements ---
+    def container(self, node) -> tuple[list[int], list[tuple[int,int]]]:
+        """Compiles the statements of node. Returns its separators and SKIP/CHECK sites
+        (loops fill in their ends)."""
+        children = node.children if isinstance(node, Tree) else [node]
+        separators:list[int] = []
+        sites:list[tuple[int,int]] = []
+        self.containers.append((separators, sites))
+        for child in children:
+            if not isinstance(child, Tree):
+                continue
+            if child.data == "separator":
+                separators.append(len(self.ops))
+                continue
+            self.foreign = False
+            self.line(child)
+            self.statement(child)
+            if self.foreign:
+                self.site(CHECK, child)
+        self.containers.pop()
+        return separators, sites
+
+    def end_container(self, separators:list[int], sites:list[tuple[int,int]], *ends:int):
+        """Fills the jump tables of the SKIP/CHECK sites of a container: ends are where to go
+        when there are more lines to skip than separators left, and the loop exit."""
+        for pc, passed in sites:
+            count = self.consts[self.ops[pc+1]][0]
+            self.consts[self.ops[pc+1]] = (count, tuple(separators[passed:]), *ends)
+
+    def line(self, child:Tree):
+        """LINE reports the statement to the profiler; it is only emitted when there is one."""
+        line = getattr(child.meta, "line", None)
+        if self.vm.profiler is not None and line is not None:
+            self.emit(LINE, line)
+
+    def site(self, op:int, node, count:int=0):
+        separators, sites = self.containers[-1]
+        pc = self.emit(op, self.const((count,)), node)
+        sites.append((pc, len(separators)))
+
+    def statement(self, child:Tree):
+        op = child.data
+        if op == 'expr_stmt':
+            self.expr(child.children[0])
+            self.emit(POP)
 
-def run_awesome(code:str):
+        elif op == 'assignment':
+            self.expr(child.children[0])
+            self.store(Itoken(child.children[1]).value)
 
+        elif op == 'print_op':
+            self.expr(child.children[0])
+            count = len([c for c in child.children if isinstance(c, Token) and c.type == 'QMARK'])
+            self.emit(PRINT, count > 1)
 
-    parser = Lark(GRAMMAR, start='start', parser='earley',propagate_positions=True)
-    interpreter = AwesomeInterpreter()
+        elif op == 'only_skip':
+            count = len([c for c in child.children if isinstance(c, Token) and c.type == 'QMARK'])
+            self.site(SKIP, child, count)
+
+        elif op == 'loop_block':
+            var_slot = self.low_operand(self.variables.slot(Itoken(child.children[0]).value), "loop variable slot")
+            self.expr(child.children[1])
+            self.emit(GET_ITER)
+            # lines left to skip by the iterable are skipped in the body
+            enter_skipping = self.emit(JUMP_IF_SKIPPING) if self.foreign else None
+            top = self.emit(FOR_ITER, var_slot)
+            self.loops.append(breaks := [])
+            separators, sites = self.container(child.children[2])
+            self.loops.pop()
+            self.emit(NEXT_ITER, var_slot | (top + 2) << ARG_BITS)
+            if sites or enter_skipping is not None:
+                done = self.emit(JUMP)
+                # when a SKIP/CHECK leaves lines to skip, the next iterations skip them:
+                # they start here, at the separators of the body
+                skipping = len(self.ops)
+                self.emit(FOR_ITER, var_slot)
+                sites.append((self.emit(CHECK, self.const((0,))), 0))
+                if enter_skipping is not None:
+                    self.ops[enter_skipping+1] = skipping
+                exit_pc = len(self.ops)
+                self.end_container(separators, sites, skipping, exit_pc)
+                self.ops[skipping+1] |= exit_pc << ARG_BITS
+                # lines left to skip after the loop
+                self.foreign = True
+                self.patch(done)
+            self.ops[top+1] |= len(self.ops) << ARG_BITS
+            for pc in breaks:
+                self.patch(pc)
 
-    # Patch the evaluator to handle func_prep
-    # original_eval = interpreter.eval_expr
-    # def patched_eval(node):
-    #     if isinstance(node, Tree) and node.data == 'func_prep':
-    #         args = interpreter.eval_expr(node.children[0])
-    #         name = Itoken(node.children[1]).value
-    #         return (name, args) # Return tuple for apply_op to catch
-    #     return original_eval(node)
-    # interpreter.eval_expr = patched_eval
-    tree = parser.parse(code)
-    print(tree.pretty());
+        elif op == 'conditional':
+            self.expr(child.children[0])
+            kw_name = Itoken(child.children[1]).value
+            skip = self.skip_count(kw_name)
+            if kw_name == "pool" and self.loops:
+                self.loops[-1].append(self.emit(BREAK_IF))
+            elif kw_name == "pool":
+                # break the loop that runs this code (if any)
+                jump = self.emit(JUMP_IF_FALSE)
+                self.returns.append(self.emit(SET_BREAK))
+                self.patch(jump)
+            elif skip is not None:
+                jump = self.emit(JUMP_IF_FALSE)
+                self.site(SKIP, child, skip)
+                self.patch(jump)
+            else:
+                self.foreign = True
+                self.emit(APPLY_IF, self.const(kw_name), child)
+
+        elif op == 'func_def':
+            arg_names = {}
+            for param in child.children[0].children:
+                if param is None: # ()
+                    continue
+                param_name = Itoken(param.children[0]).value
+                param_type = Itoken(param.children[1]).value if param.children[1] else None
+                if param_name in arg_names:
+                    message = f"Duplicate parameter name '{param_name}' in function definition."
+                    self.emit(ERROR, self.const((message, TypeError)), child)
+                    return
+                arg_names[param_name] = param_type
+            func_name = Itoken(child.children[1]).value
+            func_slot = self.variables.slot(func_name)
+            body = child.children[2]
+            code = self.vm.compile_function_body(body, tuple(map(self.variables.slot, arg_names)))
+            memo = self.vm.make_memo(func_name, arg_names)
+            self.emit(MAKE_FUNCTION, self.const((func_name, func_slot, arg_names, body, code, memo)))
+
+        elif op == 'codeblock_def':
+            name = Itoken(child.children[0]).value
+            is_delayed = len(child.children) > 2 and child.children[1] == "@"
+            self.foreign = not is_delayed
+            self.emit(CODEBLOCK_DEF, self.const((name, self.vm.compile(child.children[-1]), is_delayed)))
+
+        elif op == 'codeblock_run':
+            self.foreign = True
+            self.emit(CODEBLOCK_RUN, self.const(Itoken(child.children[0]).value))
+
+        elif op == 'apply_keyword':
+            self.expr(child.children[0])
+            self.foreign = True
+            kw_name = Itoken(child.children[2]).value
+            if kw_name == "import":
+                self.emit(IMPORT, 0, child)
+            else:
+                self.emit(APPLY_FIRST, self.const(kw_name), child)
+
+        elif op in ("separator", "start"):
+            pass
+        else:
+            self.emit(ERROR, self.const((f"Unknown statement type: {op}", RuntimeError)), child)
+
+    def function_statement(self, child:Tree):
+        """Function bodies return the value of their last expression; @??????? only skips their blocks."""
+        op = child.data
+        self.foreign = False
+        if op in ('print_op', 'assignment', 'expr_stmt', 'loop_block', 'func_def', 'codeblock_def', 'codeblock_run'):
+            self.line(child)
+        if op == 'print_op':
+            self.expr(child.children[0])
+            self.emit(DUP)
+            self.emit(PRINT)
+            self.emit(SET_LAST)
+        elif op == 'assignment':
+            self.expr(child.children[0])
+            self.emit(DUP)
+            self.store(Itoken(child.children[1]).value)
+            self.emit(SET_LAST)
+        elif op == 'expr_stmt':
+            self.expr(child.children[0])
+            self.emit(SET_LAST)
+        elif op in ('loop_block', 'func_def', 'codeblock_def', 'codeblock_run'):
+            jump = self.emit(JUMP_IF_SKIPPING)
+            self.statement(child)
+            self.patch(jump)
+        else:
+            return
+        if self.foreign:
+            self.returns.append(self.emit(CHECK_BREAK))
+
+    @staticmethod
+    def skip_count(kw_name:str) -> int|None:
+        if kw_name.startswith("@") and len(kw_name) > 1 and set(kw_name[1:]) == {"?"}:
+            return len(kw_name) - 1
+        return None
+
+    def store(self, target:str):
+        if target.isdigit():
+            self.emit(STORE_LIT, self.const(target))
+        elif self.ops[-2:-1] in ([BINARY_VV], [BINARY_VN]) and self.consts[self.ops[-1]][-1] < 0:
+            # `a+b -> c` in one instruction
+            self.consts[self.ops[-1]] = self.consts[self.ops[-1]][:-1] + (self.variables.slot(target),)
+        else:
+            self.emit(STORE_VAR, self.variables.slot(target))
+
+    # --- Expressions ---
+    def expr(self, node):
+        if not isinstance(node, Tree):
+            return self.literal(node)
+        op = node.data
+        if op == "neg":
+            self.expr(node.children[0])
+            self.emit(NEG, 0, node)
+        elif op in ('number_lit', 'string', 'rev_string'):
+            self.literal(node.children[0])
+        elif op == 'variable':
+            self.emit(LOAD_VAR, self.variables.slot(Itoken(node.children[0]).value), node)
+        elif op == 'list_literal':
+            for item in node.children:
+                self.expr(item)
+            self.emit(BUILD_LIST, len(node.children))
+        elif op == 'complete_expression':
+            self.expr(node.children[0])
+        elif op == 'simple_expression':
+            self.simple_expression(node)
+        elif op == 'func_call':
+            args = node.children[0]
+            if isinstance(args, Tree) and args.data == 'list_literal':
+                # CALL takes the arguments from the stack
+                for item in args.children:
+                    self.expr(item)
+                count = len(args.children)
+            else:
+                self.expr(args)
+                count = -1 # a list
+            self.foreign = True
+            name = Itoken(node.children[1]).value
+            self.emit(CALL, self.const((name, self.variables.slot(name), count)), node)
+        elif op == 'func_prep':
+            self.expr(node.children[0])
+            self.emit(FUNC_PREP, self.const(Itoken(node.children[1]).value))
+        elif op == 'gen_arithmetic':
+            self.expr(node.children[0])
+            self.expr(node.children[1])
+            self.emit(GEN_ARITH, 0, node)
+        elif op == 'gen_const':
+            self.expr(node.children[0])
+            self.emit(GEN_CONST)
+        elif op == 'gen_func':
+            for seed in node.children[:-1]:
+                self.expr(seed)
+            self.foreign = True
+            self.emit(GEN_FUNC, self.const((Itoken(node.children[-1]).value, len(node.children) - 1)), node)
+        else:
+            self.emit(ERROR, self.const((f"Unknown expression type: {op}", RuntimeError)), node)
+
+    def literal(self, token):
+        if isinstance(token, Token) and token.type == 'NUMBER':
+            self.emit(LOAD_NUM, self.const((token.value, int(token.value))))
+            return
+        value = self.vm._parse_val(token)
+        if self.vm.is_use_errors(token, value):
+            self.emit(USE_ERRORS)
+        self.emit(LOAD_STR, self.const(value))
+
+    def simple_expression(self, node):
+        """Operands are pushed left to right. Operators follow them left to right, or in
+        precedence (postfix) order when one of them is an OP_WS."""
+        fold = self.vm.compile_fold(node, self.vm.compile_operator_chain(node))
+        if fold is not None:
+            # no node: if recomputing it fails, the tree closure has set current_node already
+            self.emit(LOAD_FOLD, self.const(fold))
+            return
+        operands = node.children[0::2]
+        op_tokens = node.children[1::2]
+        self.foreign = self.foreign or any(str(t) in FOREIGN_OPERATORS and not self.is_literal(right)
+                                           for t, right in zip(op_tokens, operands[1:]))
+        if not any(getattr(t, 'type', None) == 'OP_WS' for t in op_tokens):
+            self.expr(operands[0])
+            for op_token, operand in zip(op_tokens, operands[1:]):
+                self.expr(operand)
+                self.binary(str(op_token), node)
+            return
+
+        self.expr(operands[0])
+        pending:list[str] = []
+        for op_token, operand in zip(op_tokens, operands[1:]):
+            precedence = PRECEDENCE.get(str(op_token), 0)
+            while pending and PRECEDENCE.get(pending[-1], 0) >= precedence:
+                self.binary(pending.pop(), node)
+            pending.append(str(op_token))
+            self.expr(operand)
+        while pending:
+            self.binary(pending.pop(), node)
+
+    @staticmethod
+    def is_literal(node) -> bool:
+        while isinstance(node, Tree) and node.data == 'complete_expression':
+            node = node.children[0]
+        return isinstance(node, Token) or (isinstance(node, Tree) and node.data in ('list_literal', 'string', 'rev_string', 'number_lit'))
+
+    def binary(self, op_text:str, node):
+        """BINARY, merged with the LOAD_VAR/LOAD_NUM of its operands when they were just pushed."""
+        operator = self.vm.operator_index(op_text)
+        ops = self.ops
+        if ops[-2:-1] not in ([LOAD_VAR], [LOAD_NUM]):
+            self.emit(BINARY, operator, node)
+        elif ops[-4:-3] == [LOAD_VAR]:
+            left = ops[-3]
+            right = ((ops[-1],) if ops[-2] == LOAD_VAR else self.consts[ops[-1]])
+            index = len(self.nodes) - 2
+            if len(right) == 1:
+                self.operand_nodes[index, right[0]] = self.nodes[-1]
+            # the left one last: in `a-a` it is the one that is read first
+            self.operand_nodes[index, left] = self.nodes[-2]
+            del ops[-2:], self.nodes[-1]
+            ops[-2:] = (BINARY_VV if len(right) == 1 else BINARY_VN), self.const((operator, left, *right, -1))
+            self.nodes[-1] = node
+        else:
+            if ops[-2] == LOAD_VAR:
+                self.operand_nodes[len(self.nodes) - 1, ops[-1]] = self.nodes[-1]
+            ops[-2:] = (BINARY_VAR if ops[-2] == LOAD_VAR else BINARY_NUM), self.low_operand(operator, "operator") | ops[-1] << ARG_BITS
+            self.nodes[-1] = node
+
+
+class AwesomeVM(AwesomeInterpreter):
+    """Runs programs compiled by CodeBuilder on a stack machine."""
+    def __init__(self):
+        super().__init__()
+        # BINARY's argument indexes these
+        self.operators:list[Callable[[Any, Any], AwesomeType]] = []
+        self.operator_indexes:dict[str,int] = {}
+        # for two ints, when that is what the operator method does
+        self.int_operators:list[Callable[[int, int], int]|None] = []
+
+    def operator_index(self, op_text:str) -> int:
+        if op_text not in self.operator_indexes:
+            self.operator_indexes[op_text] = len(self.operators)
+            self.operators.append(self.operator(op_text))
+            self.int_operators.append(INT_OPERATORS.get(op_text))
+        return self.operator_indexes[op_text]
+
+    def compile(self, node) -> Code:
+        builder = CodeBuilder(self)
+        builder.end_container(*builder.container(node), len(builder.ops))
+        return builder.code()
+
+    def compile_function_body(self, node, params:tuple[int, ...]=()) -> Code:
+        builder = CodeBuilder(self)
+        for child in (node.children if isinstance(node, Tree) else [node]):
+            if isinstance(child, Tree):
+                builder.function_statement(child)
+        return builder.code(params)
+
+    def compile_program(self, node) -> Callable[[], None]:
+        code = self.compile(node)
+        return lambda: self.execute(code)
+
+    def call_func(self, name:str, arg_values:list):
+        fn = self.get_function(name)
+        if isinstance(fn, AwesomeFunction) and isinstance(fn.code, functools.partial) and len(arg_values) == len(fn.args):
+            return self.execute(fn.code.args[0], arg_values)
+        return super().call_func(name, arg_values)
+
+    def execute(self, code:Code, args:list|None=None) -> AwesomeType:
+        """Runs code (with args for its params, if it is a function body) and returns the value
+        of its last expression."""
+        slots = self.vars.slots
+        patches = self.literal_patches
+        operators = self.operators
+        int_operators = self.int_operators
+        line = self.output.line
+        # the callers of the running function: (code, pc, stack, last value, params, their previous values)
+        frames:list[tuple] = []
+        recursion_limit = sys.getrecursionlimit()
+        if args is not None:
+            frames.append((None, 0, [], 0, code.params, [slots[slot] for slot in code.params]))
+            for slot, value in zip(code.params, args):
+                slots[slot] = value
+        ops, consts = code.ops, code.consts
+        stack:list = []
+        push, pop = stack.append, stack.pop
+        last = 0
+        pc = 0
+        try:
+            while True:
+                op = ops[pc]
+                arg = ops[pc+1]
+                pc += 2
+                if op == LOAD_VAR:
+                    value = slots[arg]
+                    if value is UNSET:
+                        self.undefined(code, pc, arg)
+                    push(value)
+                elif op == BINARY_VV:
+                    operator_index, a, b, target = consts[arg]
+                    left, value = slots[a], slots[b]
+                    if left is UNSET or value is UNSET:
+                        self.undefined(code, pc, a if left is UNSET else b)
+                    if type(left) is int and type(value) is int and int_operators[operator_index]:
+                        value = int_operators[operator_index](left, value)
+                    else:
+                        value = operators[operator_index](left, value)
+                    if target < 0:
+                        push(value)
+                    else:
+                        slots[target] = value
+                elif op == BINARY_VN:
+                    operator_index, a, key, default, target = consts[arg]
+                    left, value = slots[a], patches.get(key, default)
+                    if left is UNSET:
+                        self.undefined(code, pc, a)
+                    if type(left) is int and type(value) is int and int_operators[operator_index]:
+                        value = int_operators[operator_index](left, value)
+                    else:
+                        value = operators[operator_index](left, value)
+                    if target < 0:
+                        push(value)
+                    else:
+                        slots[target] = value
+                elif op == BINARY_VAR:
+                    value = slots[arg >> ARG_BITS]
+                    if value is UNSET:
+                        self.undefined(code, pc, arg >> ARG_BITS)
+                    left = stack[-1]
+                    if type(left) is int and type(value) is int and int_operators[arg & ARG_MASK]:
+                        stack[-1] = int_operators[arg & ARG_MASK](left, value)
+                    else:
+                        stack[-1] = operators[arg & ARG_MASK](left, value)
+                elif op == STORE_VAR:
+                    slots[arg] = pop()
+                elif op == LOAD_NUM:
+                    key, default = consts[arg]
+                    push(patches.get(key, default))
+                elif op == BINARY_NUM:
+                    key, default = consts[arg >> ARG_BITS]
+                    left, value = stack[-1], patches.get(key, default)
+                    if type(left) is int and type(value) is int and int_operators[arg & ARG_MASK]:
+                        stack[-1] = int_operators[arg & ARG_MASK](left, value)
+                    else:
+                        stack[-1] = operators[arg & ARG_MASK](left, value)
+                elif op == BINARY:
+                    value = pop()
+                    left = stack[-1]
+                    if type(left) is int and type(value) is int and int_operators[arg]:
+                        stack[-1] = int_operators[arg](left, value)
+                    else:
+                        stack[-1] = operators[arg](left, value)
+                elif op == NEXT_ITER:
+                    item = next(stack[-1], UNSET)
+                    if item is UNSET:
+                        pop()
+                    else:
+                        slots[arg & ARG_MASK] = item
+                        pc = arg >> ARG_BITS
+                elif op == CHECK:
+                    if self.should_break or self.skip_lines_counter:
+                        pc = self.check(consts[arg], stack, len(ops) - 2)
+                elif op == CALL:
+                    name, slot, count = consts[arg]
+                    fn = slots[slot]
+                    if type(fn) is AwesomeFunction and type(fn.code) is functools.partial:
+                        callee = fn.code.args[0]
+                        params = callee.params
+                        if count == len(params):
+                            if len(frames) > recursion_limit:
+                                raise RecursionError("maximum recursion depth exceeded")
+                            # same dynamic scoping as call_func: params are restored on return
+                            frames.append((code, pc, stack, last, params, [*map(slots.__getitem__, params)]))
+                            for slot in reversed(params):
+                                slots[slot] = pop()
+                            code, ops, consts, pc, last = callee, callee.ops, callee.consts, 0, 0
+                            stack = []
+                            push, pop = stack.append, stack.pop
+                            continue
+                    if count < 0:
+                        args = pop()
+                        assert isinstance(args,list)
+                    elif count:
+                        args = stack[-count:]
+                        del stack[-count:]
+                    else:
+                        args = []
+                    self.current_node = code.nodes[pc//2 - 1]
+                    push(self.call_func(name, args))
+                elif op == RETURN:
+                    if arg:
+                        last = pop()
+                    if not frames:
+                        return last
+                    caller, pc, stack, value, params, prev_values = frames.pop()
+                    for slot, prev in zip(params, prev_values):
+                        slots[slot] = prev
+                    if caller is None: # called with args
+                        return last
+                    code, ops, consts = caller, caller.ops, caller.consts
+                    push, pop = stack.append, stack.pop
+                    push(last)
+                    last = value
+                elif op == FOR_ITER:
+                    item = next(stack[-1], UNSET)
+                    if item is UNSET:
+                        pop()
+                        pc = arg >> ARG_BITS
+                    else:
+                        slots[arg & ARG_MASK] = item
+                elif op == JUMP:
+                    pc = arg
+                elif op == BREAK_IF:
+                    if pop():
+                        pop() # the iterator
+                        pc = arg
+                elif op == JUMP_IF_FALSE:
+                    if not pop():
+                        pc = arg
+                elif op == BUILD_LIST:
+                    if arg:
+                        items = stack[-arg:]
+                        del stack[-arg:]
+                        push(items)
+                    else:
+                        push([])
+                elif op == SET_LAST:
+                    last = pop()
+                elif op == LOAD_STR:
+                    push(consts[arg])
+                elif op == POP:
+                    pop()
+                elif op == LOAD_FOLD:
+                    value = consts[arg].value
+                    push(consts[arg].get() if value is UNSET else value)
+                elif op == DUP:
+                    push(stack[-1])
+                elif op == PRINT:
+                    line(f">> {pop()}" if arg else str(pop()))
+                elif op == SKIP:
+                    self.current_node = code.nodes[pc//2 - 1]
+                    self.skip_lines(consts[arg][0])
+                    pc = self.check(consts[arg], stack, len(ops) - 2)
+                elif op == CHECK_BREAK:
+                    if self.should_break:
+                        pc = arg
+                elif op == JUMP_IF_SKIPPING:
+                    if self.skip_lines_counter:
+                        pc = arg
+                elif op == GET_ITER:
+                    items = pop()
+                    # Handle Python list or LazyList, fallback for non-iterables
+                    push(iter(items if isinstance(items, Iterable) else []))
+                elif op == NEG:
+                    n = pop()
+                    self.current_node = code.nodes[pc//2 - 1]
+                    assert isinstance(n,int)
+                    push(-n)
+                elif op == STORE_LIT:
+                    self.patch_literal(consts[arg], pop())
+                elif op == FUNC_PREP:
+                    push((consts[arg], pop()))
+                elif op == GEN_ARITH:
+                    next_value = pop()
+                    start = pop()
+                    self.current_node = code.nodes[pc//2 - 1]
+                    push(self.gen_arithmetic(start, next_value))
+                elif op == GEN_CONST:
+                    push(self.gen_const(pop()))
+                elif op == GEN_FUNC:
+                    func_name, count = consts[arg]
+                    seeds = stack[len(stack)-count:]
+                    del stack[len(stack)-count:]
+                    self.current_node = code.nodes[pc//2 - 1]
+                    push(self.gen_func(func_name, seeds))
+                elif op == APPLY_IF:
+                    value = pop()
+                    if value:
+                        self.run_apply(consts[arg], value)
+                elif op == APPLY_FIRST:
+                    value = pop()[0]
+                    assert isinstance(value,AwesomeFunction)
+                    self.run_apply(consts[arg], value)
+                elif op == IMPORT:
+                    self.current_node = code.nodes[pc//2 - 1]
+                    self.import_module(pop())
+                elif op == LINE:
+                    self.profiler.line(arg) # type: ignore
+                elif op == SET_BREAK:
+                    self.should_break = True
+                    pc = arg
+                elif op == MAKE_FUNCTION:
+                    _, func_slot, arg_names, body, fn_code, memo = consts[arg]
+                    self.epoch += 1
+                    run = functools.partial(self.execute, fn_code)
+                    if memo is not None or self.profiler is not None:
+                        # not a partial, so CALL goes through call_awesome (the memo, the profiler)
+                        run = lambda run=run: run()
+                    slots[func_slot] = AwesomeFunction(arg_names, body, run, fn_code.params, memo)
+                elif op == CODEBLOCK_DEF:
+                    name, block, is_delayed = consts[arg]
+                    self.codeblocks[name] = block
+                    # If not delayed (no @), run immediately per spec
+                    if not is_delayed:
+                        self.execute(block)
+                elif op == CODEBLOCK_RUN:
+                    if consts[arg] in self.codeblocks:
+                        self.execute(self.codeblocks[consts[arg]])
+                elif op == USE_ERRORS:
+                    self.xor_errors = False
+                elif op == ERROR:
+                    message, cls = consts[arg]
+                    self.current_node = code.nodes[pc//2 - 1]
+                    self.error(message, cls)
+                else:
+                    raise RuntimeError(f"Unknown opcode {op}")
+        except Exception as e:
+            # point current_node at the failing instruction, unless an inner execute did
+            if not getattr(e, "awesome_located", False):
+                node = code.nodes[pc//2 - 1]
+                if node is not None:
+                    self.current_node = node
+                e.awesome_located = True # type: ignore[attr-defined]
+            # the callers get their parameters back, as on RETURN
+            for *_, params, prev_values in reversed(frames):
+                for slot, prev in zip(params, prev_values):
+                    slots[slot] = prev
+            raise
+
+    def undefined(self, code:Code, pc:int, slot:int):
+        index = pc//2 - 1
+        self.current_node = code.operand_nodes.get((index, slot), code.nodes[index])
+        try:
+            self.error(f"Variable '{self.vars.name(slot)}' not defined.",NameError)
+        except NameError as e:
+            # located at the variable, not at the instruction's expression
+            e.awesome_located = True # type: ignore[attr-defined]
+            raise
+
+    def check(self, table:tuple, stack:list, return_pc:int) -> int:
+        """Where a SKIP/CHECK continues: after a separator, at the end of its container,
+        at the loop exit (on a break) or at return_pc (on a break outside a loop)."""
+        _, separators, end, *loop_exit = table
+        if self.should_break:
+            if not loop_exit:
+                return return_pc
+            self.should_break = False
+            stack.pop() # the iterator
+            return loop_exit[0]
+        count = self.skip_lines_counter
+        if count <= len(separators):
+            self.skip_lines_counter = 0
+            return separators[count-1]
+        # the rest of the lines are skipped after this container
+        self.skip_lines_counter = count - len(separators)
+        return end
+
+# --- Running ---
+
+BACKENDS = {"tree": AwesomeInterpreter, "vm": AwesomeVM}
+
+def dump(text:str, path:str):
+    """Writes a diagnostic dump to path, or to stdout for "-"."""
+    if path == "-":
+        print(text)
+    else:
+        with open(path, "w") as f:
+            f.write(text + "\n")
+
+def disassemble(code:Code, name:str="<program>") -> str:
+    """code.dis() followed by the listings of the function bodies and codeblocks it defines."""
+    listings = [f"== {name}", code.dis()]
+    for const in code.consts:
+        if isinstance(const, tuple) and len(const) == 6 and isinstance(const[4], Code):
+            # MAKE_FUNCTION: (name, slot, arg names, body, code, memo)
+            listings.append(disassemble(const[4], f"function {const[0]} ({', '.join(const[2])})"))
+        elif isinstance(const, tuple) and len(const) == 3 and isinstance(const[1], Code):
+            # CODEBLOCK_DEF: (name, code, is_delayed)
+            listings.append(disassemble(const[1], f"codeblock {const[0]}"))
+    return "\n\n".join(listings)
+
+def run_awesome(code:str, parser:str="earley", backend:str="tree", memo_stats:bool=False,
+                dump_tree:str|None=None, dump_ir:str|None=None, timings:bool=False,
+                profile:bool=False, profile_stacks:str|None=None):
+    """
+    Runs a program and prints its error, if it has one, the way programs expect it.
+    dump_tree and dump_ir are paths ("-" for stdout) for the parse tree and the bytecode
+    listing; timings prints how long parsing, compiling and running took to stderr.
+    profile prints the profiler's tables to stderr, profile_stacks is a path for its
+    collapsed stacks (and profiles too).
+    """
+    interpreter = BACKENDS[backend]()
+    if profile or profile_stacks is not None:
+        interpreter.profiler = LazyList.profiler = Profiler()
+    interpreter.modules.parser = parser
+
+    phases:list[tuple[str, float]] = []
+    start = time.perf_counter()
+    tree = parse(code, parser)
+    phases.append(("parse", time.perf_counter() - start))
+    if dump_tree is not None:
+        dump(tree.pretty().rstrip("\n"), dump_tree)
 
     try:
-        interpreter.run_container(tree)
+        start = time.perf_counter()
+        program = interpreter.compile_program(tree)
+        phases.append(("compile", time.perf_counter() - start))
+        if dump_ir is not None:
+            # the tree backend has no bytecode of its own: show what the VM would run
+            vm = interpreter if isinstance(interpreter, AwesomeVM) else AwesomeVM()
+            dump(disassemble(vm.compile(tree)), dump_ir)
+        if interpreter.profiler is not None:
+            interpreter.profiler.start()
+        start = time.perf_counter()
+        try:
+            program()
+        finally:
+            phases.append(("execute", time.perf_counter() - start))
     except Exception as e:
         error = []
         error.append(f"Awesome Error: {e}")
@@ -767,13 +2695,78 @@ def run_awesome(code:str):
         if interpreter.xor_errors:
             lno = interpreter.line if isinstance(interpreter.line,int) else 0
             error_str = prebuilt.errors.encode_xor_readable(error_str,lno)
-        print(error_str)
+        interpreter.output.line(error_str)
 
         # raise
+    finally:
+        interpreter.output.flush()
+        if memo_stats:
+            for memo in interpreter.memos:
+                print(f"memo {memo.stats()}", file=sys.stderr)
+        if timings:
+            for phase, seconds in phases:
+                print(f"{phase:>8} {seconds * 1000:10.2f} ms", file=sys.stderr)
+        profiler = interpreter.profiler
+        if profiler is not None:
+            LazyList.profiler = None
+            profiler.finish()
+            print(profiler.report(code), file=sys.stderr)
+            if profile_stacks is not None:
+                dump(profiler.collapsed(), profile_stacks)
 
 # --- Test Script ---
 
 
+def main(argv=None):
+    cli = argparse.ArgumentParser(prog="awesome", description="Run an Awesome (.^%>) program")
+    cli.add_argument("--parser", choices=PARSERS, default="earley",
+                     help="earley (default) or lalr, a faster LALR(1) parser with a contextual lexer")
+    cli.add_argument("--backend", choices=BACKENDS, default="tree",
+                     help="tree (default) walks the parse tree, vm compiles it to bytecode first")
+    cli.add_argument("--lazy-cache", default="unbounded", metavar="POLICY",
+                     help="what infinite lists keep in memory: unbounded (default), window:N "
+                          "or disk[:N[:DIR]] (last N in memory, older items in a temp file)")
+    cli.add_argument("--output-buffering", choices=prebuilt.output.MODES,
+                     help="when printed lines are written: line (each one), block (every 64 KiB) "
+                          "or full (at exit); default line on a terminal, block otherwise")
+    cli.add_argument("--pi-cache", metavar="DIR",
+                     help="keep the digits of pi computed in DIR, so later runs start from them")
+    cli.add_argument("--dump-tree", metavar="FILE",
+                     help="write the parse tree to FILE (- for stdout) before running")
+    cli.add_argument("--dump-ir", metavar="FILE",
+                     help="write the bytecode listing (what the vm backend runs) to FILE (- for stdout)")
+    cli.add_argument("--time", action="store_true",
+                     help="print how long parsing, compiling and running took to stderr")
+    cli.add_argument("--profile", action="store_true",
+                     help="print the time, calls, infinite list items and memory blocks of every line "
+                          "and function to stderr")
+    cli.add_argument("--profile-stacks", metavar="FILE",
+                     help="profile, and write the stacks to FILE (- for stdout) for flame graph tools")
+    cli.add_argument("--memo-size", type=int, default=Memo.default_size, metavar="N",
+                     help=f"entries kept per `$memo` function (default {Memo.default_size}, 0 for no limit)")
+    cli.add_argument("--memo-stats", action="store_true",
+                     help="print the hits and misses of every `$memo` function to stderr at exit")
+    cli.add_argument("file")
+    cli.add_argument("args", nargs=argparse.REMAINDER, help="arguments for the program (args)")
+    opts = cli.parse_args(argv)
+    try:
+        name, *args = parse_cache_policy(opts.lazy_cache)
+    except ValueError as e:
+        cli.error(str(e))
+    if name == "disk" and args[1] is not None and not os.path.isdir(args[1]):
+        cli.error(f"--lazy-cache: no such directory {args[1]!r}")
+    LazyList.cache_policy = opts.lazy_cache
+    if opts.memo_size < 0:
+        cli.error("--memo-size must be 0 or more")
+    Memo.default_size = opts.memo_size
+    prebuilt.pi.PI.cache_dir = opts.pi_cache
+    prebuilt.output.sink.set_mode(opts.output_buffering)
+
+    # args is [file, *program args], without the interpreter's own options
+    prebuilt.builtin_vars.args = prebuilt.python_to_external([opts.file, *opts.args], list[str])
+    with open(opts.file) as f:
+        run_awesome(f.read(), opts.parser, opts.backend, opts.memo_stats,
+                    opts.dump_tree, opts.dump_ir, opts.time, opts.profile, opts.profile_stacks)
+
 if __name__ == "__main__":
-    import sys
-    run_awesome(open(sys.argv[1]).read())
\ No newline at end of file
+    main()
\ No newline at end of file
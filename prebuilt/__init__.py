@@ -1,49 +1,47 @@
 
 from ._utils import fn,builtin_funcs,builtin_vars
+import importlib
 import sys
 
-from .importpy import convert4,pythonic,python_to_external
+from ._importpy import convert4
+from ._convert import pythonic,python_to_external
+from ._packed import PackedList
+from ._vector import mul_lists, sub_lists
 
-from . import system,inf,errors
+from . import inf,pi,output
+
+# imported on first use: a program that never runs a command, imports a Python module
+# or decodes an error doesn't pay for subprocess, inspect plans or the XOR tables
+builtin_funcs.lazy("prebuilt.system", "!", "!|", "!!")
+builtin_funcs.lazy("prebuilt.importpy", "importpy", "importpyclass")
+builtin_funcs.lazy("prebuilt.errors", "e2l", "e2lf")
+LAZY_MODULES = {"system", "importpy", "errors"}
+
+def __getattr__(name):
+    # prebuilt.errors and the like, for code that uses a lazy module directly
+    if name in LAZY_MODULES:
+        return importlib.import_module(f"{__name__}.{name}")
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 # system
 @fn("print")
 @convert4()
-def builtin_print(inp: str) -> None:
-    print(inp)
+def builtin_print(inp) -> None:
+    if type(inp) is PackedList:
+        output.sink.packed(inp)
+    else:
+        output.sink.line(pythonic(inp, str, "print::inp"))
     return None
 
 @fn("uppercase")
 def builtin_uppercase(s: list[int]) -> list[int]:
     # print("uppercase:", chr(s[0]), "->", chr(s[0]).upper())
+    if isinstance(s, PackedList) and isinstance(s.data, bytes) and s.data.isascii():
+        return PackedList(s.data.upper())
     return [ord(chr(c).upper()) for c in s]
 
 # math
-
-def pi_digits():
-    """
-    Generator that yields the digits of π one at a time using using a spigot algorithm.
-    First yield is '3', then '.', then digits.
-    """
-    q, r, t, k, n, l = 1, 0, 1, 1, 3, 3
-
-    yield '3'
-    yield '.'
-
-    while True:
-        if 4*q + r - t < n*t:
-            yield n
-            r = 10 * (r - n*t)
-            n = (10 * (3*q + r)) // t - 10*n
-            q *= 10
-        else:
-            r = (2*q + r) * l
-            n = (q * (7*k) + 2 + r) // (t * l)
-            q *= k
-            t *= l
-            l += 2
-            k += 1
-
-builtin_vars.pi = pi_digits()
+# the shared digit store; the interpreter shows it to programs as an infinite list
+builtin_vars.pi = pi.PI
 
 builtin_vars.args = python_to_external(sys.argv[1:],list[str])
\ No newline at end of file
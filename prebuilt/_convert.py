@@ -1,8 +1,25 @@
 # pyright: reportReturnType=false
+import functools
 from types import FunctionType
-from typing import Type, get_origin, get_args,TypeVar
+from collections.abc import Iterator, Sequence
+from typing import Any, Callable, Type, get_origin, get_args,TypeVar
+from ._packed import PackedList
 T = TypeVar('T')
 
+# Converting a value means looking at its type first: `list[list[int]]` is a list, of lists,
+# of ints. to_python and to_external do that once per type and return (cached) functions
+# that only look at the value, so a list[str] of 100k lines costs one type inspection, not
+# one per line. pythonic and python_to_external are the same conversions, one value at a time.
+
+
+def _prefix(error_prefix:str) -> str:
+    return f"{error_prefix}: " if error_prefix else ""
+
+
+def _got(value) -> str:
+    return f"got {type(value).__name__}"
+
+
 def pythonic(value, target_type:Type[T],error_prefix="")->T:
     """
     Convert a value from the restricted external representation
@@ -13,136 +30,268 @@ def pythonic(value, target_type:Type[T],error_prefix="")->T:
       - list
       - function (not handled here)
     """
+    return to_python(target_type)(value, error_prefix)
+
+
+def python_to_external(value, original_type):
+    """
+    Convert a Python value into its restricted external representation.
+    """
+    return to_external(original_type)(value)
+
+ext = python_to_external
+
+
+# ---------- external -> Python ----------
+
+def to_python(target_type) -> Callable[[Any, str], Any]:
+    """The function (value, error_prefix) converting external values to target_type."""
+    try:
+        return _cached_to_python(target_type)
+    except TypeError:
+        # an unhashable type (Annotated with a list, ...) is built every time
+        return _build_to_python(target_type)
+
+
+@functools.lru_cache(maxsize=None)
+def _cached_to_python(target_type):
+    return _build_to_python(target_type)
+
+
+def _build_to_python(target_type):
     origin = get_origin(target_type)
     args = get_args(target_type)
 
     # ---------- str ----------
     # list[int] -> str (ASCII)
     if target_type is str:
-        if not isinstance(value, list) or not all(isinstance(x, int) for x in value):
-            raise TypeError(f"{error_prefix}: Expected list[int] for str. instead we got {type(value)}")
-        return ''.join(chr(x) for x in value)
+        def to_str(value, error_prefix=""):
+            if type(value) is PackedList:
+                return value.to_str()
+            if not isinstance(value, Sequence):
+                raise TypeError(f"{_prefix(error_prefix)}Expected list[int] for str, {_got(value)}")
+            try:
+                # every code point < 256: one bulk conversion
+                return bytes(value).decode("latin-1")
+            except (ValueError, TypeError):
+                pass
+            for i, x in enumerate(value):
+                if not isinstance(x, int):
+                    raise TypeError(f"{_prefix(error_prefix)}Expected list[int] for str, item {i} is {type(x).__name__}")
+            try:
+                return ''.join(map(chr, value))
+            except (ValueError, OverflowError):
+                raise ValueError(f"{_prefix(error_prefix)}list[int] for str has an int that is not a character") from None
+        return to_str
 
     # ---------- int ----------
     if target_type is int:
-        if not isinstance(value, int):
-            raise TypeError("Expected int")
-        return value
+        def to_int(value, error_prefix=""):
+            if not isinstance(value, int):
+                raise TypeError(f"{_prefix(error_prefix)}Expected int, {_got(value)}")
+            return value
+        return to_int
 
     # ---------- bool ----------
     if target_type is bool:
-        if not isinstance(value, int):
-            raise TypeError("Expected int for bool")
-        return bool(value)
+        def to_bool(value, error_prefix=""):
+            if not isinstance(value, int):
+                raise TypeError(f"{_prefix(error_prefix)}Expected int for bool, {_got(value)}")
+            return bool(value)
+        return to_bool
 
     # ---------- float ----------
     # [[digits], decimal_pos] -> float
     if target_type is float:
-        if isinstance(value, int):
-            return float(value)
-
-        if (
-            not isinstance(value, list)
-            or len(value) != 2
-            or not isinstance(value[0], list)
-            or not isinstance(value[1], int)
-        ):
-            raise TypeError("Expected [[digits], decimal_pos] for float")
-
-        digits, decimal_pos = value
-        if not all(isinstance(d, int) for d in digits):
-            raise TypeError("Digits must be int")
-
-        if not digits:
-            return 0.0
-
-        if decimal_pos < 0:
-            decimal_pos = len(digits) + decimal_pos
-        if not (0 <= decimal_pos <= len(digits)):
-            raise ValueError("Invalid decimal position")
-
-        s = ''.join(str(d) for d in digits)
-        if decimal_pos == 0:
-            return float(f"0.{s}")
-        if decimal_pos == len(digits):
-            return float(s)
-        return float(f"{s[:decimal_pos]}.{s[decimal_pos:]}")
+        return _to_float
 
     # ---------- list[T] ----------
     if origin is list and args:
-        if not isinstance(value, list):
-            raise TypeError("Expected list")
         inner = args[0]
-        return [pythonic(v, inner,error_prefix) for v in value]
+        if inner is int:
+            def to_int_list(value, error_prefix=""):
+                if type(value) is PackedList:
+                    return list(value.data)
+                # any read-only list view the interpreter hands out, too
+                if not isinstance(value, Sequence):
+                    raise TypeError(f"{_prefix(error_prefix)}Expected list, {_got(value)}")
+                items = list(value)
+                for i, x in enumerate(items):
+                    if not isinstance(x, int):
+                        raise TypeError(f"{_prefix(error_prefix)}Expected int at index {i}, got {type(x).__name__}")
+                return items
+            return to_int_list
 
-    raise TypeError(f"{error_prefix}:Unsupported target type: {target_type}")
+        convert_item = to_python(inner)
+        def to_list(value, error_prefix=""):
+            if not isinstance(value, Sequence):
+                raise TypeError(f"{_prefix(error_prefix)}Expected list, {_got(value)}")
+            return [convert_item(v, error_prefix) for v in value]
+        return to_list
 
+    # ---------- tuple[T, ...] ----------
+    # a list with one value per position
+    if origin is tuple and args:
+        if len(args) == 2 and args[1] is Ellipsis:
+            convert_list = to_python(list[args[0]])
+            return lambda value, error_prefix="": tuple(convert_list(value, error_prefix))
+        converters = tuple(map(to_python, args))
+        def to_tuple(value, error_prefix=""):
+            if not isinstance(value, Sequence):
+                raise TypeError(f"{_prefix(error_prefix)}Expected list for {target_type}, {_got(value)}")
+            if len(value) != len(converters):
+                raise TypeError(f"{_prefix(error_prefix)}Expected {len(converters)} items for {target_type}, got {len(value)}")
+            return tuple(convert(v, error_prefix) for convert, v in zip(converters, value))
+        return to_tuple
 
-def python_to_external(value, original_type):
-    """
-    Convert a Python value into its restricted external representation.
-    """
+    def unsupported(value, error_prefix=""):
+        raise TypeError(f"{_prefix(error_prefix)}Unsupported target type: {target_type}")
+    return unsupported
+
+
+def _to_float(value, error_prefix=""):
+    if isinstance(value, int):
+        return float(value)
+
+    # the digits may be a PackedList (a list[int] result) or a list view, like any list
+    if (
+        not isinstance(value, Sequence)
+        or len(value) != 2
+        or not isinstance(value[0], Sequence)
+        or not isinstance(value[1], int)
+    ):
+        raise TypeError(f"{_prefix(error_prefix)}Expected [[digits], decimal_pos] for float, {_got(value)}")
+
+    digits, decimal_pos = value
+    if not all(isinstance(d, int) for d in digits):
+        raise TypeError(f"{_prefix(error_prefix)}Digits must be int")
+
+    if not digits:
+        return 0.0
+
+    if decimal_pos < 0:
+        decimal_pos = len(digits) + decimal_pos
+    if not (0 <= decimal_pos <= len(digits)):
+        raise ValueError(f"{_prefix(error_prefix)}Invalid decimal position")
+
+    s = ''.join(str(d) for d in digits)
+    if decimal_pos == 0:
+        return float(f"0.{s}")
+    if decimal_pos == len(digits):
+        return float(s)
+    return float(f"{s[:decimal_pos]}.{s[decimal_pos:]}")
+
+
+# ---------- Python -> external ----------
+
+def to_external(original_type) -> Callable[[Any], Any]:
+    """The function converting Python values of original_type to external values."""
+    try:
+        return _cached_to_external(original_type)
+    except TypeError:
+        return _build_to_external(original_type)
+
+
+@functools.lru_cache(maxsize=None)
+def _cached_to_external(original_type):
+    return _build_to_external(original_type)
+
+
+def _build_to_external(original_type):
     origin = get_origin(original_type)
     args = get_args(original_type)
 
     # ---------- str ----------
     # str -> list[int]
     if original_type is str:
-        if not isinstance(value, str):
-            raise TypeError("Expected str")
-        return [ord(c) for c in value]
+        def from_str(value):
+            if not isinstance(value, str):
+                raise TypeError(f"Expected str, {_got(value)}")
+            return PackedList.from_str(value)
+        return from_str
 
     # ---------- int ----------
     if original_type is int:
-        if not isinstance(value, int):
-            raise TypeError(f"Expected int, got {type(value)}")
-        return value
+        def from_int(value):
+            if not isinstance(value, int):
+                raise TypeError(f"Expected int, got {type(value)}")
+            return value
+        return from_int
+
     if original_type is FunctionType:
-        if not isinstance(value, FunctionType):
-            raise TypeError("Expected function")
-        return value
+        def from_function(value):
+            if not isinstance(value, FunctionType):
+                raise TypeError(f"Expected function, {_got(value)}")
+            return value
+        return from_function
 
     # ---------- bool ----------
     if original_type is bool:
-        if not isinstance(value, bool):
-            raise TypeError("Expected bool")
-        return 1 if value else 0
+        def from_bool(value):
+            if not isinstance(value, bool):
+                raise TypeError(f"Expected bool, {_got(value)}")
+            return 1 if value else 0
+        return from_bool
 
     # ---------- float ----------
     # float -> [[digits], decimal_pos]
     if original_type is float:
-        if not isinstance(value, (int, float)):
-            raise TypeError("Expected float")
-
-        if value == 0:
-            return [[], 0]
-
-        s = format(float(value), 'f').rstrip('0').rstrip('.')
-        if '.' in s:
-            decimal_pos = s.index('.')
-        else:
-            decimal_pos = len(s)
-
-        digits = [int(c) for c in s if c.isdigit()]
-        return [digits, decimal_pos]
+        return _from_float
 
     # ---------- list[T] ----------
     if origin is list and args:
-        if not isinstance(value, list):
-            raise TypeError(f"Expected list,got {type(value)}",value)
         inner = args[0]
-        return [python_to_external(v, inner) for v in value]
+        convert_item = to_external(inner)
+        def from_list(value):
+            if not isinstance(value, list):
+                raise TypeError(f"Expected list,got {type(value)}",value)
+            if inner is int:
+                packed = PackedList.from_ints(value)
+                if isinstance(packed, PackedList):
+                    return packed
+            elif inner is str and all(type(v) is str for v in value):
+                return [PackedList.from_str(v) for v in value]
+            return [convert_item(v) for v in value]
+        return from_list
 
     if origin is tuple and args:
-        if not isinstance(value, tuple):
-            raise TypeError("Expected tuple")
-        l = []
-        for i, inner in enumerate(args):
-            v = value[i]
-            l.append(python_to_external(v, inner))
-        return list(l)
+        converters = tuple(map(to_external, args))
+        def from_tuple(value):
+            if not isinstance(value, tuple):
+                raise TypeError(f"Expected tuple, {_got(value)}")
+            if len(value) < len(converters):
+                raise TypeError(f"Expected a tuple of {len(converters)} for {original_type}, got {len(value)} items")
+            return [convert(v) for convert, v in zip(converters, value)]
+        return from_tuple
+
+    # ---------- Iterator[T] ----------
+    # converted item by item as it is consumed; the interpreter makes it an infinite list
+    # when the builtin is registered with fn(name, streams=True)
+    if origin is Iterator and args:
+        convert_item = to_external(args[0])
+        def from_iterator(value):
+            if not isinstance(value, Iterator):
+                raise TypeError(f"Expected iterator, {_got(value)}")
+            return map(convert_item, value)
+        return from_iterator
+
+    def unsupported(value):
+        raise TypeError(f"Unsupported target type: {original_type} (origin={origin}, args={args})")
+    return unsupported
+
+
+def _from_float(value):
+    if not isinstance(value, (int, float)):
+        raise TypeError(f"Expected float, {_got(value)}")
 
+    if value == 0:
+        return [[], 0]
 
-    raise TypeError(f"Unsupported target type: {original_type} (origin={origin}, args={args})")
+    s = format(float(value), 'f').rstrip('0').rstrip('.')
+    if '.' in s:
+        decimal_pos = s.index('.')
+    else:
+        decimal_pos = len(s)
 
-ext = python_to_external
\ No newline at end of file
+    digits = [int(c) for c in s if c.isdigit()]
+    return [digits, decimal_pos]
@@ -4,7 +4,10 @@ import functools
 from typing import Optional, get_type_hints, get_origin, get_args
 from types import FunctionType
 
-from ._convert import python_to_external, pythonic
+from ._convert import python_to_external, pythonic, to_python, to_external
+
+POSITIONAL = (inspect.Parameter.POSITIONAL_ONLY, inspect.Parameter.POSITIONAL_OR_KEYWORD)
+
 def positional_arg_limits(sig: inspect.Signature):
     """
     Returns (min_positional, max_positional)
@@ -36,7 +39,9 @@ def wrap_pyfunc(
 ):
     """
     Wrap a Python function to convert between external types (int, list, function)
-    and Python types using external_to_python and python_to_external.
+    and Python types using pythonic and python_to_external. Parameters without a type
+    are passed as they are, and so are defaults: a parameter that isn't given gets the
+    function's own default.
     """
 
     if param_types is not None and return_type_str is None:
@@ -56,46 +61,73 @@ def wrap_pyfunc(
         param_type_map = {p.name: hints.get(p.name, type(None)) for p in params}
         return_type = hints.get('return', type(None))
 
-    @functools.wraps(func)
-    def wrapper(*args, **kwargs):
-        min_pos, max_pos = positional_arg_limits(sig)
-        given = len(args)
-
+    # The plan, worked out once per function: a converter for every typed parameter and one
+    # for the result. Awesome always passes arguments by position, so the common call is a
+    # range check and a zip; keywords (from Python callers) go through sig.bind.
+    name = func.__name__
+    # (converter, error prefix) by parameter name
+    converters = {
+        param_name: (to_python(target_type), f"{name}::{param_name}")
+        for param_name, target_type in param_type_map.items()
+        if target_type and target_type != type(None)
+    }
+    convert_result = to_external(return_type) if return_type and return_type != type(None) else None
+    min_pos, max_pos = positional_arg_limits(sig)
+    # one (converter, error prefix) or None per parameter, if every parameter can be passed by position
+    positional = [converters.get(p.name) for p in params]
+    if any(p.kind not in POSITIONAL for p in params):
+        positional = None
+    elif not any(positional):
+        positional = []
+
+    def check_count(given:int):
         if max_pos is not None and given > max_pos:
             raise TypeError(
-                f"{func.__name__} takes {max_pos} positional arguments "
+                f"{name} takes {max_pos} positional arguments "
                 f"but {given} were given"
             )
 
         if given < min_pos:
             raise TypeError(
-                f"{func.__name__} takes at least {min_pos} positional arguments "
+                f"{name} takes at least {min_pos} positional arguments "
                 f"but {given} were given"
             )
 
-        # Bind and apply defaults
+    def call_bound(args, kwargs):
+        check_count(len(args))
         try:
             bound_args = sig.bind(*args, **kwargs)
         except TypeError as e:
-            raise TypeError(f"{func.__name__}: {e}") from None
-        bound_args.apply_defaults()
-
-        # Convert arguments from external to Python
-        converted = {}
-        for param_name, value in bound_args.arguments.items():
-            target_type = param_type_map.get(param_name)
-            if target_type and target_type != type(None):
-                converted[param_name] = pythonic(value, target_type,f"{func.__name__}::{param_name}")
+            raise TypeError(f"{name}: {e}") from None
+
+        # Convert the given arguments from external to Python; missing ones keep the
+        # function's own (Python) defaults
+        arguments = bound_args.arguments
+        for param_name, value in arguments.items():
+            if param_name not in converters:
+                continue
+            convert, prefix = converters[param_name]
+            kind = sig.parameters[param_name].kind
+            if kind == inspect.Parameter.VAR_POSITIONAL:
+                arguments[param_name] = tuple(convert(v, prefix) for v in value)
+            elif kind == inspect.Parameter.VAR_KEYWORD:
+                arguments[param_name] = {key: convert(v, prefix) for key, v in value.items()}
             else:
-                converted[param_name] = value
+                arguments[param_name] = convert(value, prefix)
+        return func(*bound_args.args, **bound_args.kwargs)
 
-        # Call function
-        result = func(**converted)
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if kwargs or positional is None or not min_pos <= len(args) <= max_pos: # type: ignore
+            result = call_bound(args, kwargs)
+        elif positional:
+            result = func(*[value if plan is None else plan[0](value, plan[1]) for plan, value in zip(positional, args)])
+        else:
+            result = func(*args)
 
         # Convert return value from Python to external
-        if return_type and return_type != type(None):
-            result = python_to_external(result, return_type)
-
+        if convert_result is not None:
+            result = convert_result(result)
         return result
 
     return wrapper
@@ -0,0 +1,107 @@
+from array import array
+from collections.abc import Sequence
+import operator
+
+
+class PackedList(Sequence):
+    """
+    Compact, immutable list of ints used for Awesome strings (and int lists coming from Python).
+
+    The values live in `bytes` when every one fits in a byte (1 byte per character) and in
+    `array('q')` otherwise (8 bytes); slices keep their parent's storage. To the language it
+    is a list: indexing, `+`, `*`, `&` and `==` behave as on list[int], and it prints like one.
+    """
+    __slots__ = ("data",)
+
+    def __init__(self, data: bytes | array):
+        self.data = data
+
+    # ---------- construction ----------
+    @classmethod
+    def from_str(cls, s: str) -> "PackedList":
+        """One int per character (its code point)."""
+        try:
+            return cls(s.encode("latin-1"))
+        except UnicodeEncodeError:
+            return cls(array("q", map(ord, s)))
+
+    @classmethod
+    def from_ints(cls, values) -> "PackedList | list":
+        """Packs values if they are all ints in int64 range, else returns them as a list."""
+        if isinstance(values, PackedList):
+            return values
+        values = values if isinstance(values, (list, tuple)) else list(values)
+        try:
+            return cls(bytes(values))
+        except (ValueError, TypeError):
+            pass
+        try:
+            return cls(array("q", values))
+        except (OverflowError, TypeError):
+            return list(values)
+
+    def to_str(self) -> str:
+        if isinstance(self.data, bytes):
+            return self.data.decode("latin-1")
+        return "".join(map(chr, self.data))
+
+    # ---------- sequence ----------
+    def __len__(self):
+        return len(self.data)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return PackedList(self.data[index])
+        return self.data[index]
+
+    def __iter__(self):
+        return iter(self.data)
+
+    def __reversed__(self):
+        return PackedList(self.data[::-1])
+
+    def __contains__(self, item):
+        if not isinstance(item, int):
+            return False
+        if isinstance(self.data, bytes):
+            return 0 <= item < 256 and item in self.data
+        return item in self.data
+
+    # ---------- operators ----------
+    def __eq__(self, other):
+        if isinstance(other, PackedList):
+            if type(self.data) is type(other.data):
+                return self.data == other.data
+            return list(self.data) == list(other.data)
+        if isinstance(other, list):
+            return len(self.data) == len(other) and list(self.data) == other
+        if isinstance(other, Sequence) and not isinstance(other, str):
+            return len(self.data) == len(other) and all(map(operator.eq, self.data, other))
+        return NotImplemented
+
+    __hash__ = None
+
+    def __add__(self, other):
+        if isinstance(other, PackedList):
+            if type(self.data) is type(other.data):
+                return PackedList(self.data + other.data)
+            # bytes + array('q'): widen the bytes side
+            return PackedList(array("q", iter(self.data)) + array("q", iter(other.data)))
+        if isinstance(other, Sequence) and not isinstance(other, str):
+            return list(self.data) + list(other)
+        return NotImplemented
+
+    def __radd__(self, other):
+        if isinstance(other, Sequence) and not isinstance(other, str):
+            return list(other) + list(self.data)
+        return NotImplemented
+
+    def __mul__(self, times):
+        if isinstance(times, int):
+            return PackedList(self.data * times)
+        return NotImplemented
+
+    __rmul__ = __mul__
+
+    def __repr__(self):
+        return repr(list(self.data))
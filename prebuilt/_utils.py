@@ -1,3 +1,4 @@
+import importlib
 from types import FunctionType,SimpleNamespace
 class NS(SimpleNamespace):
     def set(self, name:str, value):
@@ -5,12 +6,43 @@ class NS(SimpleNamespace):
     def to_dict(self):
         return self.__dict__
 
-builtin_funcs:dict[str,FunctionType] = {}
+class Builtins(dict[str,FunctionType]):
+    """
+    builtin_funcs: name -> function. Names registered with `lazy` are only known by the
+    module that defines them, which is imported (and registers them with @fn) the first
+    time one of them is looked up, so a program pays only for the builtins it uses.
+    """
+    def __init__(self):
+        super().__init__()
+        self.loaders:dict[str,str] = {}
+
+    def lazy(self, module:str, *names:str):
+        for name in names:
+            self.loaders[name] = module
+
+    def __contains__(self, name):
+        return dict.__contains__(self, name) or name in self.loaders
+
+    def __missing__(self, name):
+        module = self.loaders.get(name)
+        if module is None:
+            raise KeyError(name)
+        importlib.import_module(module)
+        del self.loaders[name]
+        return dict.__getitem__(self, name)
+
+builtin_funcs = Builtins()
 builtin_vars = NS()
 
-def fn(name:str):
+def fn(name:str, streams:bool=False):
+    """
+    Registers a builtin. With streams, the iterator it returns is given to the program as
+    an infinite list, read as the program reaches its items; any other function's result
+    is passed on as it is.
+    """
     def decorator(func:FunctionType) -> FunctionType:
+        if streams:
+            func.streams = True # type: ignore[attr-defined]
         builtin_funcs[name] = func
         return func
     return decorator
-
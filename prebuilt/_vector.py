@@ -0,0 +1,85 @@
+"""
+Bulk list arithmetic for the interpreter's `*` and `-` on lists.
+
+NumPy is optional. When it is installed and both operands are long PackedLists, their
+buffers are viewed as int64 arrays without copying and the result is computed in one
+vector operation, as long as it provably fits in int64. Everything else (plain lists,
+big ints, no NumPy) goes through the pure Python path; both give the same values.
+
+Importing NumPy takes longer than most programs run, so it is imported by the first
+operation on lists long enough to use it.
+"""
+import operator
+from array import array
+from collections.abc import Sequence
+from typing import Any
+
+from ._packed import PackedList
+
+# numpy, None when it isn't installed, or NOT_LOADED before the first long list
+NOT_LOADED: Any = object()
+np: Any = NOT_LOADED
+
+# below this, setting up the arrays costs more than it saves
+NUMPY_MIN_LEN = 512
+INT64_MAX = 2**63 - 1
+
+
+def load_numpy():
+    """the numpy module, or None"""
+    global np
+    if np is NOT_LOADED:
+        try:
+            import numpy
+            np = numpy
+        except ImportError:
+            np = None
+    return np
+
+
+def as_int64(packed: PackedList):
+    """the values of packed as an int64 ndarray (a view for array('q') storage)"""
+    data = packed.data
+    if isinstance(data, array):
+        return np.frombuffer(data, dtype=np.int64)
+    return np.frombuffer(data, dtype=np.uint8).astype(np.int64)
+
+
+def from_int64(values) -> PackedList:
+    if not values.size or (int(values.min()) >= 0 and int(values.max()) < 256):
+        return PackedList(values.astype(np.uint8).tobytes())
+    return PackedList(array("q", values.tobytes()))
+
+
+def magnitude(values) -> int:
+    """largest |x| in values, as a Python int (so -2**63 doesn't overflow)"""
+    if not values.size:
+        return 0
+    return max(-int(values.min()), int(values.max()))
+
+
+def use_numpy(a, b, n: int) -> bool:
+    return (n >= NUMPY_MIN_LEN and isinstance(a, PackedList) and isinstance(b, PackedList)
+            and load_numpy() is not None)
+
+
+def mul_lists(a: Sequence, b: Sequence) -> Sequence:
+    """[1,2,3]*[4,5,6] -> [4,10,18], truncated to the shorter list"""
+    n = min(len(a), len(b))
+    if use_numpy(a, b, n):
+        x, y = as_int64(a)[:n], as_int64(b)[:n]
+        if magnitude(x) * magnitude(y) <= INT64_MAX:
+            return from_int64(x * y)
+    return list(map(operator.mul, a, b))
+
+
+def sub_lists(a: Sequence, b: Sequence) -> Sequence:
+    """"Asuf"-"suf" -> "A": drops b from the end of a; a is returned as is if it doesn't end with b"""
+    n = len(b)
+    if n == 0 or n > len(a):
+        return a
+    if use_numpy(a, b, n):
+        same = bool(np.array_equal(as_int64(a)[len(a) - n:], as_int64(b)))
+    else:
+        same = a[len(a) - n:] == b
+    return a[:len(a) - n] if same else a
@@ -1,5 +1,7 @@
 import base64
+from collections import Counter
 from . import fn,convert4
+from .output import sink
 
 def encode_xor_readable(message: str, line_number: int) -> str:
     """
@@ -28,6 +30,12 @@ def _line_to_key_parts(line: int):
 
 ENGLISH_FREQ_ORDER = " :_'().etaoinshrdlcumwfgypbvkjxqz"
 weights = {ch: (len(ENGLISH_FREQ_ORDER) - i) for i, ch in enumerate(ENGLISH_FREQ_ORDER)}
+# weights by byte value (of the lowercased character)
+BYTE_WEIGHTS = [weights.get(chr(b).lower(), 0) if b < 128 else 0 for b in range(256)]
+# XOR_TABLES[g] xors every byte with g, for bytes.translate
+XOR_TABLES = [bytes(b ^ g for b in range(256)) for g in range(256)]
+# how run_awesome starts every error message
+ERROR_HEADER = b"Awesome Error:"
 
 def _score_english(s: str) -> float:
     """
@@ -41,6 +49,37 @@ def _score_english(s: str) -> float:
     max_score = len(s) * len(ENGLISH_FREQ_ORDER)  # max possible if all letters were 'e'
     return score / max_score
 
+def rank_keys(raw_xored: bytes) -> list[tuple[float, int]]:
+    """
+    (score, g) for g = 1..255, best first: _score_english of raw_xored xor g, computed from
+    one byte histogram of raw_xored instead of decoding 255 candidates. xor only permutes
+    byte values, so the candidate for g has histogram[b] bytes of value b ^ g. Only ASCII
+    bytes have weights, and they decode to one character each; the length used is the
+    number of bytes (the same as the string's, unless the message isn't ASCII).
+    """
+    if not raw_xored:
+        return [(0, g) for g in range(1, 256)]
+    # one pass over the payload: the byte values it has and how often
+    histogram = Counter(raw_xored).items()
+    max_score = len(raw_xored) * len(ENGLISH_FREQ_ORDER)
+    ranked = [
+        (sum(count * BYTE_WEIGHTS[b ^ g] for b, count in histogram) / max_score, g)
+        for g in range(1, 256)
+    ]
+    # stable, so equal scores keep the lower key first
+    ranked.sort(key=lambda x: x[0], reverse=True)
+    return ranked
+
+def _split_encoded(encoded: str) -> tuple[str, int]:
+    """payload and n of an encode_xor_readable result ('|payload|n' or 'payload')"""
+    if encoded.startswith("|") and "|" in encoded[1:]:
+        # suffix is after last '|'
+        parts = encoded[1:].rsplit("|", 1)
+        if len(parts) == 2 and parts[1].isdigit():
+            return parts[0], int(parts[1])
+    # malformed; treat entire string as payload
+    return encoded, 0
+
 def decode_xor_all(encoded: str, top_n: int = 3) -> None:
     """
     Given an encoded string from encode_xor_readable, try all 255 possible keys (g=1..255)
@@ -48,47 +87,69 @@ def decode_xor_all(encoded: str, top_n: int = 3) -> None:
     the full line = n*255 + g when printing.
     """
     # parse optional prefix/suffix
-    n = 0
-    payload = encoded
-    if encoded.startswith("|") and "|" in encoded[1:]:
-        # suffix is after last '|'
-        parts = encoded[1:].rsplit("|", 1)
-        if len(parts) == 2 and parts[1].isdigit():
-            payload, suffix_n = parts[0], parts[1]
-            n = int(suffix_n)
-        else:
-            # malformed; treat entire string as payload
-            payload = encoded
+    payload, n = _split_encoded(encoded)
 
     # decode Ascii85 to raw xored bytes; if that fails, warn and return
     try:
         raw_xored = base64.a85decode(payload.encode("ascii"))
     except Exception as e:
-        print("Payload is not valid Ascii85:", e)
+        sink.line(f"Payload is not valid Ascii85: {e}")
         return
 
-    print(f"Decoded payload length (bytes): {len(raw_xored)}")
-    print("Trying 255 candidate keys (g = 1..255).  Marker '*' = likely readable candidate.\n")
-    candidates = []
+    sink.line(f"Decoded payload length (bytes): {len(raw_xored)}")
+    sink.line("Trying 255 candidate keys (g = 1..255).  Marker '*' = likely readable candidate.\n")
 
-    for g in range(1, 256):  # 1..255 inclusive (255 options)
+    sink.line(f"Top {top_n} likely decodings:\n")
+    # only the candidates that are shown are decoded
+    for score, g in rank_keys(raw_xored)[:top_n]:
         line = n * 255 + g
-        orig_bytes = bytes((b ^ g) for b in raw_xored)
         # Try to decode as UTF-8; use 'replace' to always get a string for printing
-        s = orig_bytes.decode("utf-8",errors="replace")
+        s = raw_xored.translate(XOR_TABLES[g]).decode("utf-8",errors="replace")
+        shown = s if len(s) <= 250 else s[:240] + "…[truncated]"
+        sink.line(f"line {line:5d} (key {g:3d}) score {score:.2f}: {shown}")
 
-        score = _score_english(s)
-        candidates.append((score, line, g, s))
-    candidates.sort(reverse=True, key=lambda x: x[0])
+    sink.line("\nHint: look for entries that look like real error messages (contain 'Error', ':', file names, etc.).")
 
-    print(f"Top {top_n} likely decodings:\n")
-    for score, line, g, s in candidates[:top_n]:
-        shown = s if len(s) <= 250 else s[:240] + "…[truncated]"
-        print(f"line {line:5d} (key {g:3d}) score {score:.2f}: {shown}")
+def decode_error(encoded: str) -> tuple[int, str] | None:
+    """
+    (line, message) of an error printed by run_awesome, or None if encoded isn't one.
+    Every such message starts with ERROR_HEADER, so its first byte gives the key away:
+    no search, one translate.
+    """
+    payload, n = _split_encoded(encoded.strip())
+    try:
+        raw_xored = base64.a85decode(payload.encode("ascii"))
+    except Exception:
+        return None
+    if len(raw_xored) < len(ERROR_HEADER):
+        return None
+    g = raw_xored[0] ^ ERROR_HEADER[0]
+    if g == 0 or not raw_xored.startswith(ERROR_HEADER.translate(XOR_TABLES[g])):
+        return None
+    return n * 255 + g, raw_xored.translate(XOR_TABLES[g]).decode("utf-8", errors="replace")
 
-    print("\nHint: look for entries that look like real error messages (contain 'Error', ':', file names, etc.).")
+def decode_log(path: str) -> int:
+    """
+    Prints every encoded error in the file at path (one per line, among any other output),
+    decoded, with the line of the log it is on. Returns how many were found.
+    """
+    found = 0
+    with open(path, encoding="utf-8", errors="replace") as f:
+        for log_line, text in enumerate(f, 1):
+            decoded = decode_error(text)
+            if decoded is None:
+                continue
+            found += 1
+            line, message = decoded
+            sink.line(f"{path}:{log_line}: line {line}: {message}")
+    return found
 
 @fn("e2l")
 @convert4()
 def e2l(encoded: str, top_n: int = 3):
-    return decode_xor_all(encoded,top_n)
\ No newline at end of file
+    return decode_xor_all(encoded,top_n)
+
+@fn("e2lf")
+@convert4()
+def e2lf(path: str) -> int:
+    return decode_log(path)
@@ -1,12 +1,15 @@
-from types import FunctionType
-from . import fn
+from dataclasses import dataclass
+from types import FunctionType, ModuleType
+import sys
+from . import fn, output
 
 from prebuilt._importpy import wrap_pyfunc,convert4,parse_type_string
 
 import importlib
 import inspect
-from typing import List, Any, Optional, Tuple, get_type_hints
-from ._convert import pythonic, python_to_external,pythonic,pythonic
+from typing import List, Any, Callable, Optional, Tuple, get_type_hints
+from ._convert import pythonic, python_to_external, to_python
+from ._packed import PackedList
 
 from ._importpy import wrap_pyfunc
 
@@ -20,6 +23,64 @@ def split_annotation_str(annotation:str)->Tuple[List[str],Optional[str]]:
 
 
 
+# ---------- cache ----------
+# Everything importpy and importpyclass already wrapped, by ("function", module, name),
+# ("class", module, class, annotations) or ("instance", module, class, annotations, init
+# args, methods) -> (module, value). Wrapping inspects signatures and type hints, so a
+# script that imports inside a loop or a function only pays for it once. An entry is only
+# used while its module is still the one in sys.modules (importlib.reload replaces it);
+# cache_clear drops entries on demand.
+_cache: dict[tuple, tuple[ModuleType, Any]] = {}
+_stats = {"hits": 0, "misses": 0}
+# called with (key, hit) on every lookup, for tracing what a script imports
+stats_hook: Optional[Callable[[tuple, bool], None]] = None
+
+
+def cache_info() -> dict[str, int]:
+    """hits, misses and the number of cached entries"""
+    return {**_stats, "entries": len(_cache)}
+
+
+def cache_clear(module_name: Optional[str] = None):
+    """Drops the cached wrappers (and reused instances) of module_name, or of every module."""
+    for key in [key for key in _cache if module_name is None or key[1] == module_name]:
+        del _cache[key]
+    if module_name is None:
+        _stats.update(hits=0, misses=0)
+
+
+def _cached(key: tuple, module_name: str, build: Callable[[ModuleType], Any]):
+    entry = _cache.get(key)
+    hit = entry is not None and sys.modules.get(module_name) is entry[0]
+    _stats["hits" if hit else "misses"] += 1
+    if stats_hook is not None:
+        stats_hook(key, hit)
+    if hit:
+        return entry[1] # type: ignore
+    module = _import_module(module_name)
+    value = build(module)
+    _cache[key] = (module, value)
+    return value
+
+
+def _import_module(module_name: str) -> ModuleType:
+    try:
+        return importlib.import_module(module_name)
+    except ImportError as e:
+        raise ImportError(f"Cannot import module '{module_name}': {e}")
+
+
+def _frozen(value):
+    """value as a hashable key (lists become tuples, strings their bytes), or TypeError"""
+    if isinstance(value, (list, tuple)):
+        return tuple(map(_frozen, value))
+    if isinstance(value, PackedList):
+        data = value.data
+        return (PackedList, data if type(data) is bytes else data.tobytes())
+    hash(value)
+    return value
+
+
 @fn("importpy")
 @convert4()
 def importpy(module_name_list:list[int], function_names_list:list[list[int]],
@@ -38,58 +99,37 @@ def importpy(module_name_list:list[int], function_names_list:list[list[int]],
     module_name = pythonic(module_name_list,str)
     function_names = pythonic(function_names_list, list[str])
 
-
-    # Import the module
-    try:
-        module = importlib.import_module(module_name)
-    except ImportError as e:
-        raise ImportError(f"Cannot import module '{module_name}': {e}")
-
-    # Wrap and return functions
-    wrapped_functions = []
-    for func_name in function_names:
+    def wrap(module, func_name):
         if not hasattr(module, func_name):
             raise AttributeError(f"Module '{module_name}' has no function '{func_name}'")
-
-        func = getattr(module, func_name)
-
         # Wrap the function for Awesome calling
-        wrapped = wrap_pyfunc(func)
-        wrapped_functions.append(wrapped)
+        return wrap_pyfunc(getattr(module, func_name))
 
+    return [
+        _cached(("function", module_name, func_name), module_name, lambda module: wrap(module, func_name))
+        for func_name in function_names
+    ]
 
-    return wrapped_functions
 
-@fn("importpyclass")
-def importpyclass(
-    module_name_list: list[int],
-    class_name_list: list[int],
-    cls_init_args: list,
-    cls_methods: list[list[int]],
-    annotation_str_list:Optional[list[int]]=None
-) -> list:
-    """
-    Import a Python class, instantiate it, and return a list of wrapped bound methods.
+@dataclass
+class ClassPlan:
+    """What importpyclass works out once per class and annotation strings."""
+    cls: type
+    # (converter, error prefix) or None for each constructor argument by position;
+    # arguments past the end are passed as they are
+    init_converters: list
+    # (param types, return type) for the methods, in order, when annotated by hand
+    method_annotations: list
+    # "Instantiating ..." is printed for the first instance only
+    announced: bool = False
 
-    External inputs:
-      - module_name_list: list[int] (ASCII) -> module name string
-      - class_name_list: list[int] (ASCII) -> class name string
-      - cls_init_args: list of external values (positional constructor args)
-                      (each element is in external representation)
-      - cls_methods: list[list[int]] (ASCII lists) -> list[str] method names
 
-    Returns:
-      - list of wrapped bound methods (callables) that the external environment can call.
-    """
-    # Convert module/class/method names from ASCII lists to strings
-    module_name = pythonic(module_name_list, str)
-    class_name = pythonic(class_name_list, str)
-    method_names = pythonic(cls_methods, list[str])
+def plan_class(module, module_name: str, class_name: str, annotations: Optional[list[str]]) -> ClassPlan:
     manual_annotation = []
     init_annotation = []
 
-    if annotation_str_list is not None:
-        all_fn_annotations = pythonic(annotation_str_list, list[str])
+    if annotations is not None:
+        all_fn_annotations = list(annotations)
         init = all_fn_annotations.pop(0)
         init_params_lst,init_rt_str = split_annotation_str(init)
         init_annotation = list(map(parse_type_string,init_params_lst))
@@ -99,12 +139,6 @@ def importpyclass(
 
             manual_annotation.append( (annotation_params_lst,annotation_rt_str) )
 
-    # Import the module and class
-    try:
-        module = importlib.import_module(module_name)
-    except ImportError as e:
-        raise ImportError(f"Cannot import module '{module_name}': {e}")
-
     if not hasattr(module, class_name):
         raise AttributeError(f"Module '{module_name}' has no class '{class_name}'")
 
@@ -128,49 +162,108 @@ def importpyclass(
     except Exception:
         init_hints = {}
 
+    init_converters = []
+    for i, param in enumerate(init_params):
+        if manual_annotation:
+            target_type = init_annotation[i] if i < len(init_annotation) else None
+        else:
+            target_type = init_hints.get(param.name, None)
+        if target_type and target_type is not type(None):
+            init_converters.append((to_python(target_type), f"{class_name}::__init__::{param.name}"))
+        else:
+            # no hint available — pass raw external value through
+            init_converters.append(None)
+    return ClassPlan(cls, init_converters, manual_annotation)
+
+
+@fn("importpyclass")
+def importpyclass(
+    module_name_list: list[int],
+    class_name_list: list[int],
+    cls_init_args: list,
+    cls_methods: list[list[int]],
+    annotation_str_list:Optional[list[int]]=None,
+    reuse_instance: int = 0,
+) -> list:
+    """
+    Import a Python class, instantiate it, and return a list of wrapped bound methods.
+
+    External inputs:
+      - module_name_list: list[int] (ASCII) -> module name string
+      - class_name_list: list[int] (ASCII) -> class name string
+      - cls_init_args: list of external values (positional constructor args)
+                      (each element is in external representation)
+      - cls_methods: list[list[int]] (ASCII lists) -> list[str] method names
+      - annotation_str_list: annotations for __init__ and the methods, or 0 for none
+      - reuse_instance: if not 0, the same constructor arguments give the same instance
+                        (and the same wrapped methods) instead of a new one
+
+    Returns:
+      - list of wrapped bound methods (callables) that the external environment can call.
+    """
+    # Convert module/class/method names from ASCII lists to strings
+    module_name = pythonic(module_name_list, str)
+    class_name = pythonic(class_name_list, str)
+    method_names = pythonic(cls_methods, list[str])
+    # 0 stands for "no annotations", so reuse_instance can be given without them
+    annotations = None
+    if annotation_str_list is not None and not isinstance(annotation_str_list, int):
+        annotations = tuple(pythonic(annotation_str_list, list[str]))
+
+    plan: ClassPlan = _cached(
+        ("class", module_name, class_name, annotations), module_name,
+        lambda module: plan_class(module, module_name, class_name, None if annotations is None else list(annotations)),
+    )
+
     # Convert positional init args using hints if available
     converted_init_args = []
     for i, ext_arg in enumerate(cls_init_args or []):
-        if i < len(init_params):
-            param = init_params[i]
-            if manual_annotation:
-                target_type = init_annotation[i] if i < len(init_annotation) else None
-            else:
-                target_type = init_hints.get(param.name, None)
-            if target_type and target_type is not type(None):
-                # use helper to convert from external to Python
-                converted = pythonic(ext_arg, target_type,f"{class_name}::__init__::{param.name}")
-            else:
-                # no hint available — pass raw external value through
-                converted = ext_arg
+        converter = plan.init_converters[i] if i < len(plan.init_converters) else None
+        if converter is not None:
+            convert, prefix = converter
+            converted_init_args.append(convert(ext_arg, prefix))
         else:
             # more args provided than annotated parameters: pass raw external value
-            converted = ext_arg
-        converted_init_args.append(converted)
-
-    # Instantiate the class
-    try:
-        print(f"Instantiating {class_name} from {module_name} with args {converted_init_args}")
-        instance = cls(*converted_init_args)
-    except Exception as e:
-        raise RuntimeError(f"Failed to instantiate {class_name} from {module_name}: {e}")
-
-
-    # For each requested method, fetch bound method and wrap it
-    wrapped_methods = []
-    for mname in method_names:
-        if not hasattr(instance, mname):
-            raise AttributeError(f"Instance of '{class_name}' has no method '{mname}'")
-        bound_method = getattr(instance, mname)
-        if not callable(bound_method):
-            raise TypeError(f"Attribute '{mname}' of '{class_name}' is not callable")
-
-        # wrap the bound method so external callers can call it
-        manual = manual_annotation.pop(0) if manual_annotation else (None,None)
-
-        wrapped = wrap_pyfunc(bound_method,manual[0],manual[1])
-        wrapped_methods.append(wrapped)
-    return wrapped_methods
+            converted_init_args.append(ext_arg)
+
+    def instantiate(module=None):
+        # Instantiate the class
+        try:
+            if not plan.announced:
+                plan.announced = True
+                output.sink.line(f"Instantiating {class_name} from {module_name} with args {converted_init_args}")
+            instance = plan.cls(*converted_init_args)
+        except Exception as e:
+            raise RuntimeError(f"Failed to instantiate {class_name} from {module_name}: {e}")
+        return wrap_methods(instance)
+
+    def wrap_methods(instance):
+        # For each requested method, fetch bound method and wrap it
+        manual_annotation = list(plan.method_annotations)
+        wrapped_methods = []
+        for mname in method_names:
+            if not hasattr(instance, mname):
+                raise AttributeError(f"Instance of '{class_name}' has no method '{mname}'")
+            bound_method = getattr(instance, mname)
+            if not callable(bound_method):
+                raise TypeError(f"Attribute '{mname}' of '{class_name}' is not callable")
+
+            # wrap the bound method so external callers can call it
+            manual = manual_annotation.pop(0) if manual_annotation else (None,None)
+
+            wrapped = wrap_pyfunc(bound_method,manual[0],manual[1])
+            wrapped_methods.append(wrapped)
+        return wrapped_methods
+
+    if reuse_instance:
+        try:
+            key = ("instance", module_name, class_name, annotations,
+                   _frozen(converted_init_args), tuple(method_names))
+        except TypeError:
+            # unhashable constructor arguments can't be compared, so each call gets its own
+            return instantiate()
+        return list(_cached(key, module_name, instantiate))
+    return instantiate()
 
 
 # Helper functions for direct use in Python (not from Awesome)
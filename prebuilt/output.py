@@ -0,0 +1,88 @@
+"""
+Where programs print to: `?` and the print builtin write lines to `sink`, which collects
+them in a bytearray and hands them to sys.stdout in batches.
+
+Buffering modes:
+  - line:  every line is passed on and flushed (what a terminal shows as it happens)
+  - block: lines are passed on every BLOCK_SIZE bytes
+  - full:  lines are passed on only when flushed (at the end of the program, on an error)
+The default is line for a terminal and block otherwise, like Python's own stdout.
+
+Strings that are PackedLists of ASCII bytes are appended as they are, without becoming
+a Python str first. Pending output is passed on before a Python function runs (it may
+print itself) and when the interpreter exits, so lines come out in the order they were
+printed in every mode.
+
+`written` counts the lines printed so far, so a caller can tell whether some code printed
+(a `$memo` function's result can't stand in for a call that prints).
+"""
+import atexit
+import sys
+
+from ._packed import PackedList
+
+MODES = ("line", "block", "full")
+BLOCK_SIZE = 1 << 16
+
+
+class OutputSink:
+    def __init__(self, mode: str|None = None, block_size: int = BLOCK_SIZE):
+        self.pending = bytearray()
+        self.block_size = block_size
+        self.written = 0
+        self.set_mode(mode)
+
+    def set_mode(self, mode: str|None):
+        """line, block, full, or None for line on a terminal and block otherwise"""
+        if mode is None:
+            isatty = getattr(sys.stdout, "isatty", None)
+            mode = "line" if isatty is not None and isatty() else "block"
+        if mode not in MODES:
+            raise ValueError(f"unknown output buffering {mode!r} ({', '.join(MODES)})")
+        self.mode = mode
+        # pass pending output on once it is this long
+        self.limit = {"line": 1, "block": self.block_size, "full": sys.maxsize}[mode]
+
+    def line(self, text: str):
+        """Prints text and a newline."""
+        self.written += 1
+        if self.limit == 1:
+            sys.stdout.write(text + "\n")
+            sys.stdout.flush()
+            return
+        pending = self.pending
+        pending += text.encode("utf-8", "surrogatepass")
+        pending += b"\n"
+        if len(pending) >= self.limit:
+            self.emit()
+
+    def packed(self, value: PackedList):
+        """Prints the string value and a newline, as bytes if it is ASCII."""
+        data = value.data
+        if isinstance(data, bytes) and data.isascii():
+            self.written += 1
+            pending = self.pending
+            pending += data
+            pending += b"\n"
+            if len(pending) >= self.limit:
+                self.emit()
+        else:
+            self.line(value.to_str())
+
+    def emit(self):
+        """Passes pending output on to sys.stdout (flushed in line mode)."""
+        if self.pending:
+            text = self.pending.decode("utf-8", "surrogatepass")
+            self.pending.clear()
+            sys.stdout.write(text)
+            if self.mode == "line":
+                sys.stdout.flush()
+
+    def flush(self):
+        """Passes pending output on and flushes sys.stdout."""
+        self.emit()
+        sys.stdout.flush()
+
+
+sink = OutputSink()
+atexit.register(sink.emit)
@@ -0,0 +1,163 @@
+"""
+The digits of pi (3, 1, 4, 1, 5, ...), for the `pi` builtin.
+
+Digits are computed in blocks with the Chudnovsky series: the terms are summed exactly by
+binary splitting, and one division (and a square root) at the block's precision turns
+the sum into digits. Big numbers are `decimal.Decimal`s, whose multiplication and
+division stay fast at a million digits where plain ints (and int -> str) do not.
+
+Every block at least doubles the number of digits, so reaching n digits costs about twice
+computing n digits once. The digits live in one `bytes` (a digit per byte), shared by every
+program in the process, so indexing what is computed is O(1). With `cache_dir` set they are
+also kept in a file, and a later run starts from there.
+"""
+import decimal
+import math
+import os
+import tempfile
+from decimal import Decimal
+
+# 640320**3 / 24, the Chudnovsky series' ratio between consecutive terms
+C3_OVER_24 = 640320**3 // 24
+# each term adds about 14.18 digits
+DIGITS_PER_TERM = 14
+# smallest block computed, and extra digits computed so the last ones kept are right
+MIN_BLOCK = 1000
+GUARD_DIGITS = 20
+# term ranges at most this long are summed with ints, then turned into Decimals
+INT_RANGE = 32
+# the cache file starts with these, so a file of something else is ignored
+KNOWN_PREFIX = b"31415926535897932384"
+CACHE_FILE = "pi-digits.txt"
+# ASCII digits <-> digit values
+TO_VALUES = bytes((c - 48) & 0xFF for c in range(256))
+TO_ASCII = bytes((c + 48) & 0xFF for c in range(256))
+
+
+def _split_ints(a: int, b: int) -> tuple[int, int, int]:
+    """P, Q, T of the terms a..b-1 of the series"""
+    if b - a == 1:
+        if a == 0:
+            p = q = 1
+        else:
+            p = (6*a - 5) * (2*a - 1) * (6*a - 1)
+            q = a * a * a * C3_OVER_24
+        t = p * (13591409 + 545140134*a)
+        return p, q, -t if a & 1 else t
+    m = (a + b) // 2
+    p1, q1, t1 = _split_ints(a, m)
+    p2, q2, t2 = _split_ints(m, b)
+    return p1 * p2, q1 * q2, q2 * t1 + p1 * t2
+
+
+def _split(a: int, b: int) -> tuple[Decimal, Decimal, Decimal]:
+    """_split_ints in Decimals (exact: the context has no precision limit)"""
+    if b - a <= INT_RANGE:
+        return tuple(map(Decimal, _split_ints(a, b))) # type: ignore
+    m = (a + b) // 2
+    p1, q1, t1 = _split(a, m)
+    p2, q2, t2 = _split(m, b)
+    return p1 * p2, q1 * q2, q2 * t1 + p1 * t2
+
+
+def _inverse_sqrt(n: int, digits: int) -> Decimal:
+    """1/sqrt(n) to `digits` digits, by Newton's method from a float estimate (the
+    precision doubles every step; Decimal.sqrt is much slower at this size)"""
+    context = decimal.getcontext()
+    y = Decimal(1 / math.sqrt(n))
+    precision = 15
+    while precision < digits:
+        precision = min(2 * precision, digits)
+        context.prec = precision + 10
+        y += y * (1 - n * y * y) / 2
+    return y
+
+
+def compute(count: int) -> bytes:
+    """The first `count` digits of pi, one per byte (b'\\x03\\x01\\x04...')."""
+    precision = count + GUARD_DIGITS
+    terms = precision // DIGITS_PER_TERM + 2
+    exact = decimal.Context(prec=decimal.MAX_PREC, Emax=decimal.MAX_EMAX, Emin=decimal.MIN_EMIN)
+    with decimal.localcontext(exact) as context:
+        _, q, t = _split(0, terms)
+        # pi = 426880 * sqrt(10005) * Q / T, and sqrt(10005) = 10005 / sqrt(10005)
+        inverse = _inverse_sqrt(10005, precision)
+        context.prec = precision
+        pi = q * (426880 * 10005) * inverse / t
+        # 3.1415... -> 31415..., without a float's exponent
+        text = format(pi.scaleb(precision - 1).to_integral_value(decimal.ROUND_FLOOR), "f")
+    return text[:count].encode("ascii").translate(TO_VALUES)
+
+
+class PiDigits:
+    """
+    The digits of pi computed so far, and more on demand: `digits[i]` computes up to i.
+    The `pi` builtin is the one instance, PI.
+    """
+    def __init__(self, cache_dir: str|None = None):
+        self.digits = b""
+        # a directory to keep the digits in between runs, or None
+        self.cache_dir = cache_dir
+        self.loaded = False
+
+    def __getitem__(self, index: int) -> int:
+        if index >= len(self.digits):
+            self.ensure(index + 1)
+        return self.digits[index]
+
+    def __iter__(self):
+        index = 0
+        while True:
+            if index >= len(self.digits):
+                self.ensure(index + 1)
+            digits = self.digits
+            yield from digits[index:]
+            index = len(digits)
+
+    def __len__(self):
+        """how many digits are computed (the list itself is infinite)"""
+        return len(self.digits)
+
+    def ensure(self, count: int):
+        """Makes at least `count` digits available."""
+        if not self.loaded:
+            self.loaded = True
+            self.load()
+        if count <= len(self.digits):
+            return
+        self.digits = compute(max(count, 2 * len(self.digits), MIN_BLOCK))
+        self.save()
+
+    # ---------- disk cache ----------
+    def cache_path(self) -> str|None:
+        return os.path.join(self.cache_dir, CACHE_FILE) if self.cache_dir else None
+
+    def load(self):
+        path = self.cache_path()
+        if path is None or not os.path.exists(path):
+            return
+        with open(path, "rb") as f:
+            text = f.read().strip()
+        # a cache that isn't pi is ignored (and replaced by the next save)
+        if text.startswith(KNOWN_PREFIX) and text.isdigit() and len(text) > len(self.digits):
+            self.digits = text.translate(TO_VALUES)
+
+    def save(self):
+        path = self.cache_path()
+        if path is None:
+            return
+        try:
+            if os.path.exists(path) and os.path.getsize(path) >= len(self.digits):
+                return
+            os.makedirs(self.cache_dir, exist_ok=True) # type: ignore
+            # write a new file and rename it, so a concurrent reader never sees half of one
+            fd, temp = tempfile.mkstemp(dir=self.cache_dir, prefix=CACHE_FILE)
+            with os.fdopen(fd, "wb") as f:
+                f.write(self.digits.translate(TO_ASCII))
+            os.replace(temp, path)
+        except OSError:
+            # the cache only saves time; a read-only or full disk doesn't stop the program
+            pass
+
+
+PI = PiDigits()
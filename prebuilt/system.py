@@ -1,3 +1,8 @@
+import os
+import subprocess
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
+
 from ._convert import pythonic
 from ._importpy import wrap_pyfunc,convert4
 from ._utils import fn
@@ -12,11 +17,10 @@ def system(command: list[str]) -> tuple[str,str,int]:
     Returns: (stdout, stderr, returncode) as strings
     """
 
-    import subprocess
+    return run(command)
 
-    # Convert ASCII list to string
 
-    # Execute the command
+def run(command: list[str]) -> tuple[str,str,int]:
     process = subprocess.Popen(
         command,
         stdout=subprocess.PIPE,
@@ -27,3 +31,43 @@ def system(command: list[str]) -> tuple[str,str,int]:
     returncode = process.returncode
 
     return stdout, stderr, returncode
+
+
+@fn("!|", streams=True)
+@convert4()
+def system_stream(command: list[str]) -> Iterator[str]:
+    """
+    Execute a system command and stream its stdout, line by line (without the newline).
+
+    Returns an infinite-style list: a line is read when the program first reaches it, so a
+    loop can start on the first lines of a long (or endless) command and pool out early.
+    stderr goes to the interpreter's stderr; the status code isn't available.
+    """
+    process = subprocess.Popen(command, stdout=subprocess.PIPE, text=True)
+
+    def lines():
+        try:
+            for line in process.stdout: # type: ignore
+                yield line[:-1] if line.endswith("\n") else line
+        finally:
+            # the list is dropped before the end (pool): stop the command
+            process.stdout.close() # type: ignore
+            if process.poll() is None:
+                process.kill()
+            process.wait()
+    return lines()
+
+
+@fn("!!")
+@convert4()
+def system_batch(commands: list[list[str]], workers: int = 0) -> list[tuple[str,str,int]]:
+    """
+    Execute many system commands at once, at most `workers` at a time (0: one per CPU).
+
+    Returns one (stdout, stderr, returncode) per command, in the order they were given.
+    """
+    if not commands:
+        return []
+    workers = workers if workers > 0 else (os.cpu_count() or 1)
+    with ThreadPoolExecutor(max_workers=min(workers, len(commands))) as pool:
+        return list(pool.map(run, commands))
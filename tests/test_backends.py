@@ -0,0 +1,53 @@
+"""
+The vm backend prints what the tree backend prints, errors included.
+"""
+import os
+import subprocess
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# undefined operands of the instructions that merge a variable into a binary operator
+# (BINARY_VV, BINARY_VN, BINARY_VAR), and an operator failing on defined ones
+PROGRAMS = {
+    "var op number": '"use errors"\na-2 -> z\n',
+    "var op var": '"use errors"\n1 -> b\nb-a -> z\n',
+    "same var": '"use errors"\na-a?\n',
+    "expression op var": '"use errors"\n1 -> b\n(b+1)-a?\n',
+    "in a function": '"use errors"\n(x) f\n  x+q\nf ()\n[1](f) %>()?\n',
+    "operator error": '"use errors"\n1 -> b\nb-"x"?\n',
+}
+
+
+def run(code: str, backend: str, tmp_path) -> str:
+    program = tmp_path / "program.^%>"
+    program.write_text(code)
+    result = subprocess.run([sys.executable, os.path.join(ROOT, "langv4.py"), "--parser", "lalr",
+                             "--backend", backend, str(program)],
+                            cwd=ROOT, capture_output=True, text=True, check=True)
+    return result.stdout
+
+
+@pytest.mark.parametrize("name", PROGRAMS)
+def test_errors_match(name, tmp_path):
+    tree = run(PROGRAMS[name], "tree", tmp_path)
+    assert tree.startswith("Awesome Error: ")
+    assert run(PROGRAMS[name], "vm", tmp_path) == tree
+
+
+def test_operands_that_dont_fit_an_instruction():
+    sys.path.insert(0, ROOT)
+    import langv4
+
+    def compile_with_slots(count: int):
+        vm = langv4.AwesomeVM()
+        for i in range(count):
+            vm.vars.slot(f"v{i}")
+        return vm.compile_program(langv4.parse("0 -> t\nloop i&[1,2]\n  t+i -> t\npool i\nt?\n", "lalr"))
+
+    # the loop variable's slot is the low operand of FOR_ITER and NEXT_ITER
+    compile_with_slots(langv4.ARG_MASK - 20)
+    with pytest.raises(OverflowError, match="loop variable slot"):
+        compile_with_slots(langv4.ARG_MASK + 1)
@@ -0,0 +1,101 @@
+"""
+Folded literal-only expressions (Fold) against reassigned literals, on both backends.
+The expected outputs are what the interpreter printed before expressions were folded.
+"""
+import os
+import subprocess
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import langv4
+
+BACKENDS = ("tree", "vm")
+
+PROGRAMS = {
+    "patched in a loop": ("""\
+"use errors"
+loop i&[0,1,2]
+  1+2?
+  2*3+ 1?
+  i+10 -> 2
+pool i
+1+2?
+""", "3\n7\n11\n31\n12\n34\n13\n"),
+
+    "patched in a function body": ("""\
+"use errors"
+(x) f
+  x -> 2
+  1+2
+f ()
+1+2?
+[5](f) %>()?
+1+2?
+[7](f) %>()?
+2*2?
+""", "3\n6\n6\n8\n49\n"),
+
+    "patched to a list": ("""\
+"use errors"
+2*3?
+[5,6] -> 2
+2?
+2*3?
+""", "6\n[5, 6]\n[5, 6, 5, 6, 5, 6]\n"),
+
+    "nested folds": ("""\
+"use errors"
+(1+2)*(3+4)?
+(1+ 2*3)+ (4-1)?
+10 -> 3
+(1+2)*(3+4)?
+(1+ 2*3)+ (4-1)?
+""", "21\n10\n42\n24\n"),
+}
+
+
+def run(code: str, backend: str, tmp_path) -> str:
+    program = tmp_path / "program.^%>"
+    program.write_text(code)
+    result = subprocess.run([sys.executable, os.path.join(ROOT, "langv4.py"), "--parser", "lalr",
+                             "--backend", backend, str(program)],
+                            cwd=ROOT, capture_output=True, text=True, check=True)
+    return result.stdout
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+@pytest.mark.parametrize("name", PROGRAMS)
+def test_reassigned_literals(name, backend, tmp_path):
+    code, expected = PROGRAMS[name]
+    assert run(code, backend, tmp_path) == expected
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_folds_are_computed_when_they_run(backend):
+    code = '"use errors"\n(x) never\n  "x"*1000000\nnever ()\n1+ 2*3 -> a\n'
+    interpreter = langv4.BACKENDS[backend]()
+    program = interpreter.compile_program(langv4.parse(code, "lalr"))
+    folds = {id(fold): fold for folds in interpreter.folds.values() for fold in folds}
+    assert folds
+    assert all(fold.value is langv4.UNSET for fold in folds.values())
+
+    program()
+    computed = [fold.value for fold in folds.values() if fold.value is not langv4.UNSET]
+    # `1+ 2*3` ran, never's body didn't
+    assert computed == [7]
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+@pytest.mark.parametrize("use_errors", ['"use errors"', "'srorre esu'"])
+def test_use_errors_in_a_chain_is_not_folded(use_errors, backend, tmp_path):
+    code = f'{use_errors}* 1\n1-q?\n'
+    interpreter = langv4.BACKENDS[backend]()
+    interpreter.compile_program(langv4.parse(code, "lalr"))
+    # the number would have registered a fold
+    assert not interpreter.folds
+    # errors are printed as they are, not XOR-ed
+    assert run(code, backend, tmp_path).startswith("Awesome Error: [Line 2] Awesome Error: Variable 'q' not defined.\n")
@@ -0,0 +1,39 @@
+"""
+importpyclass with reuse_instance: the same constructor arguments give the same instance.
+"""
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from prebuilt import importpy, output
+from prebuilt._packed import PackedList
+
+BOX = '''
+class Box:
+    def __init__(self, value):
+        self.value = value
+
+    def get(self):
+        return self.value
+'''
+
+
+def box(value, reuse_instance=1):
+    name = PackedList.from_str
+    return importpy.importpyclass(name("reuse_box"), name("Box"), [value], [name("get")], 0, reuse_instance)
+
+
+def test_same_string_argument_reuses_the_instance(tmp_path, monkeypatch, capsys):
+    (tmp_path / "reuse_box.py").write_text(BOX)
+    monkeypatch.syspath_prepend(str(tmp_path))
+    importpy.cache_clear("reuse_box")
+
+    first = box(PackedList.from_str("hello"))
+    assert box(PackedList.from_str("hello")) == first
+    assert box(PackedList.from_str("other")) != first
+    assert box(PackedList.from_str("hello"), reuse_instance=0) != first
+    # announced once, through the output sink
+    output.sink.flush()
+    assert capsys.readouterr().out == "Instantiating Box from reuse_box with args [[104, 101, 108, 108, 111]]\n"
@@ -0,0 +1,126 @@
+"""
+`$memo` functions on both backends: hits and misses, the functions that are refused, and
+cached results dropped when what the function relies on changes.
+"""
+import os
+import subprocess
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+BACKENDS = ("tree", "vm")
+
+
+def run(code: str, backend: str, tmp_path) -> tuple[str, list[str]]:
+    """the program's output and its --memo-stats lines"""
+    program = tmp_path / "program.^%>"
+    program.write_text(code)
+    result = subprocess.run([sys.executable, os.path.join(ROOT, "langv4.py"), "--parser", "lalr",
+                             "--backend", backend, "--memo-stats", str(program)],
+                            cwd=ROOT, capture_output=True, text=True, check=True)
+    return result.stdout, [line for line in result.stderr.splitlines() if line.startswith("memo ")]
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_hits_and_misses(backend, tmp_path):
+    output, stats = run("""\
+"use errors"
+(x$memo) sq
+  x*x
+sq ()
+0 -> t
+loop i&[0,1,..]
+  [3](sq) %>() -> a
+  a+t -> t
+  [i](sq) %>() -> a
+  a+t -> t
+  i&[4] ?%> pool
+pool i
+t?
+""", backend, tmp_path)
+    # i = 0..4: sq 3 misses once, sq i misses for 0, 1, 2 and 4 (3 is cached by then)
+    assert output == "75\n"
+    assert stats == ["memo sq: 5 hits, 5 misses (50.0%), 5/1024 entries"]
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_refused(backend, tmp_path):
+    output, stats = run("""\
+"use errors"
+(x$memo) assigns
+  x -> y
+  x
+assigns ()
+(x$memo) reads
+  x + g
+reads ()
+(x$memo) prints
+  x?
+prints ()
+(x$memo) patches
+  x -> 7
+patches ()
+(x$memo) loops
+  loop i&[0,1]
+  pool i
+loops ()
+(x$memo) indirectly
+  [x](assigns) %>()
+indirectly ()
+3 -> g
+[1](assigns) %>() -> a
+[1](reads) %>() -> a
+[1](prints) %>()
+[1](prints) %>()
+[1](patches) %>()
+[1](loops) %>()
+[1](indirectly) %>() -> a
+""", backend, tmp_path)
+    assert output == "1\n1\n"
+    assert stats == [
+        "memo assigns: not memoized, assigns global 'y'",
+        "memo reads: not memoized, reads global 'g'",
+        "memo prints: not memoized, prints",
+        "memo patches: not memoized, patches the literal 7",
+        "memo loops: not memoized, runs a loop",
+        "memo indirectly: not memoized, assigns global 'y' (in assigns)",
+    ]
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_dropped_when_a_called_function_is_reassigned(backend, tmp_path):
+    output, stats = run("""\
+"use errors"
+(x) one
+  1
+one ()
+(x) two
+  2
+two ()
+one -> h
+(x$memo) g
+  [x](h) %>()
+g ()
+[5](g) %>()?
+[5](g) %>()?
+two -> h
+[5](g) %>()?
+""", backend, tmp_path)
+    assert output == "1\n1\n2\n"
+    assert stats == ["memo g: 1 hits, 2 misses (33.3%), 1/1024 entries"]
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_dropped_when_a_literal_is_patched(backend, tmp_path):
+    output, _ = run("""\
+"use errors"
+(x$memo) plus
+  x+2
+plus ()
+[1](plus) %>()?
+5 -> 2
+[1](plus) %>()?
+""", backend, tmp_path)
+    assert output == "3\n6\n"
@@ -0,0 +1,109 @@
+"""
+Streaming (`!|`) and batch (`!!`) system commands, with seq, yes, sh and sleep.
+"""
+import gc
+import os
+import sys
+import time
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import langv4
+
+BACKENDS = ("tree", "vm")
+
+
+def run_here(code: str, backend: str, capsys) -> list[str]:
+    """Runs code in this process (so what it started can be looked at) and returns its output
+    lines; the interpreter and its variables are dropped before it returns."""
+    interpreter = langv4.BACKENDS[backend]()
+    program = interpreter.compile_program(langv4.parse(code, "lalr"))
+    try:
+        program()
+    finally:
+        interpreter.output.flush()
+    del interpreter, program
+    gc.collect()
+    return capsys.readouterr().out.splitlines()
+
+
+def text(line: str) -> str:
+    """the string a printed list of character codes stands for"""
+    return "".join(map(chr, eval(line)))
+
+
+def gone(pid: int, timeout: float = 5) -> bool:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            return True
+        time.sleep(0.01)
+    return False
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_stream_pools_early_and_stops_the_command(backend, capsys):
+    lines = run_here("""\
+"use errors"
+[ ["sh","-c","echo $$; exec yes"] ](!|) %>() -> lines
+0 []> lines?
+0 -> n
+loop l&lines
+  n+1 -> n
+  n&[5] ?%> pool
+pool l
+n?
+1 []> lines?
+""", backend, capsys)
+    pid = int(text(lines[0]))
+    assert lines[1:] == ["5", "[121]"]
+    # yes never ends on its own: it is gone because the list was dropped
+    assert gone(pid)
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_stream_kills_a_command_that_is_still_running(backend, capsys):
+    # sleep writes nothing, so only being killed ends it before its time (dropping the
+    # list waits for the command)
+    start = time.monotonic()
+    lines = run_here("""\
+"use errors"
+[ ["sh","-c","echo $$; echo started; exec sleep 30"] ](!|) %>() -> lines
+0 []> lines?
+1 []> lines?
+""", backend, capsys)
+    assert time.monotonic() - start < 10
+    assert text(lines[1]) == "started"
+    assert gone(int(text(lines[0])))
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_stream_of_a_finite_command(backend, capsys):
+    lines = run_here("""\
+"use errors"
+[ ["seq","3"] ](!|) %>() -> lines
+loop l&lines
+  l?
+pool l
+""", backend, capsys)
+    assert list(map(text, lines)) == ["1", "2", "3"]
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_batch_results_in_input_order(backend, capsys):
+    lines = run_here("""\
+"use errors"
+[ [["sh","-c","sleep 0.3; echo first"],["echo","second"],["seq","3"]], 3 ](!!) %>() -> results
+loop r&results
+  0 []> r?
+  2 []> r?
+pool r
+""", backend, capsys)
+    # the first command ends last, its result still comes first
+    assert list(map(text, lines[0::2])) == ["first\n", "second\n", "1\n2\n3\n"]
+    assert lines[1::2] == ["0"] * 3